@@ -40,8 +40,8 @@ class BrowserSource:
         """Browser cameras remain live for their local preview."""
         return False
 
-    async def grab(self) -> Frame | None:
-        """Draws the current video frame and converts it to RGB."""
+    async def grab(self, luma: bool = False) -> Frame | None:
+        """Draws the current video frame and converts it to RGB; a canvas has no luminance plane."""
         image_data = self._bridge.grab(self._camera_id)
         if image_data is None:
             return None
@@ -88,11 +88,17 @@ class BrowserPlatform:
     async def configure(self, settings: dict[str, Any]) -> None:
         """Accepts shared settings that do not alter local inference."""
 
-    async def infer(self, rgb: np.ndarray) -> dict[str, Any]:
+    def set_inference_mode(self, mode: str) -> None:
+        """Ignored: the page runs one frame at a time either way."""
+
+    def set_batch_window(self, seconds: float) -> None:
+        """Ignored: the page never stacks frames into one call."""
+
+    async def infer(self, rgb: np.ndarray, plan: vision.Plan | None = None) -> dict[str, Any]:
         """Preprocesses in numpy and runs the model through LiteRT.js."""
         from pyodide.ffi import to_js
 
-        tensor = vision.preprocess(rgb, self.assets)
+        tensor = vision.preprocess(rgb, self.assets, plan)
         output = await self._bridge.infer(to_js(tensor.tobytes()))
         embedding = np.frombuffer(output.to_py(), dtype=np.float32)
         return vision.classify(embedding, self.assets)
@@ -144,10 +150,11 @@ class BrowserPlatform:
         except ValueError:
             return resp.status, text
 
-    async def encode_jpeg(self, rgb: np.ndarray) -> bytes | None:
-        """Encodes a frame as JPEG through a canvas in the bridge."""
+    async def encode_jpeg(self, frame: Frame) -> bytes | None:
+        """Renders a frame's view and encodes it as JPEG through a canvas in the bridge; Pyodide has no threads."""
         from pyodide.ffi import to_js
 
+        rgb = frame.view()
         rgba = np.dstack([rgb, np.full(rgb.shape[:2], 255, dtype=np.uint8)])
         result = await self._bridge.jpegFromRgba(to_js(rgba.tobytes()), rgb.shape[1], rgb.shape[0])
         if result is None:
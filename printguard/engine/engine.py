@@ -14,18 +14,19 @@ import logging
 import time
 import uuid
 from collections import deque
+from dataclasses import replace
 from typing import Any, Callable
 
 from . import reports, updates, vision
 from .cameras import sanitise_camera
-from .history import MonitorHistory
+from .history import BUCKET_CHOICES, MonitorHistory
 from .integrations import INTEGRATIONS, DeviceAction, integrations_meta
 from .monitors import monitor_watching, persisted_monitor, sanitise_monitor
 from .notifiers import NOTIFIERS, notifiers_meta
-from .platform import Frame, Platform
+from .platform import BATCH_WINDOW_S, Frame, Platform
 from .printers import sanitise_printer
 from .registry import Camera, CameraRegistry, Printer, PrinterRegistry, Token, TokenRegistry
-from .scheduler import Scheduler
+from .scheduler import Clock, Scheduler
 from .tokens import new_token
 from .watchdog import Watchdog
 
@@ -39,6 +40,18 @@ RECENT_EVENTS_MAX = 100
 RECENT_EVENT_TYPES = ("alert", "warning", "device", "error")
 EVENT_LOG_LEVELS = {"alert": logging.INFO, "warning": logging.WARNING, "error": logging.ERROR, "device": logging.DEBUG}
 UPDATE_CHECK_INTERVAL_S = 86400.0
+POWER_PROFILES: dict[str, dict[str, Any]] = {
+    "full": {"inference_budget": 1.0, "max_camera_fps": 0.0, "state_interval_s": 1.0, "history_bucket_s": 60},
+    "shared": {"inference_budget": 0.5, "max_camera_fps": 0.0, "state_interval_s": 1.0, "history_bucket_s": 60},
+    "raspberry_pi": {"inference_budget": 0.5, "max_camera_fps": 2.0, "state_interval_s": 2.0, "history_bucket_s": 300},
+    "battery": {"inference_budget": 0.25, "max_camera_fps": 1.0, "state_interval_s": 5.0, "history_bucket_s": 300},
+}
+"""Named sets of the settings that bound how much of the host PrintGuard uses.
+
+Choosing a profile applies its values; `power_profile` then names the profile the
+values match, or "custom" once one of them is changed on its own.
+"""
+
 SETTINGS_DEFAULTS: dict[str, Any] = {
     "notifiers": {},
     "update_check": True,
@@ -47,14 +60,22 @@ SETTINGS_DEFAULTS: dict[str, Any] = {
     "themes": [],
     "layout": {},
     "inference_runtime": "auto",
+    "inference_mode": "auto",
+    "batch_window_ms": BATCH_WINDOW_S * 1000.0,
+    "frame_reuse_distance": 4.0,
+    "on_demand_share": 0.25,
+    "quiet_period_s": 60.0,
+    "power_profile": "full",
+    **POWER_PROFILES["full"],
 }
 
 
 class Engine:
     """Wires the shared components together and serves the protocol."""
 
-    def __init__(self, platform: Platform) -> None:
+    def __init__(self, platform: Platform, clock: Clock = time.monotonic) -> None:
         self.platform = platform
+        self.clock = clock
         self.cameras = CameraRegistry()
         self.printers = PrinterRegistry()
         self.monitors: dict[str, dict[str, Any]] = {}
@@ -65,12 +86,14 @@ class Engine:
         self.settings: dict[str, Any] = dict(SETTINGS_DEFAULTS)
         self.update: dict[str, Any] | None = None
         self.releases: list[dict[str, Any]] = []
-        self.scheduler = Scheduler(platform, self.cameras, self._on_result, self._on_pipeline_error)
+        self.scheduler = Scheduler(platform, self.cameras, self._on_result, self._on_pipeline_error, clock)
         self.watchdog = Watchdog(self)
         self._sinks: list[Callable[[dict[str, Any]], None]] = []
         self._recent: deque[dict[str, Any]] = deque(maxlen=RECENT_EVENTS_MAX)
         self._tasks: list[asyncio.Task[None]] = []
         self._attach_tasks: dict[str, asyncio.Task[None]] = {}
+        self._activity = asyncio.Event()
+        self.cameras.watch(self._stir)
         self._handlers: dict[str, Any] = {
             "discover": self._cmd_discover,
             "camera.add": self._cmd_camera_add,
@@ -89,6 +112,7 @@ class Engine:
             "snapshot.get": self._cmd_snapshot_get,
             "notify.test": self._cmd_notify_test,
             "settings.update": self._cmd_settings_update,
+            "model.reload": self._cmd_model_reload,
             "token.create": self._cmd_token_create,
             "token.remove": self._cmd_token_remove,
             "update.check": self._cmd_update_check,
@@ -103,6 +127,7 @@ class Engine:
         self.settings = {**SETTINGS_DEFAULTS, **{k: v for k, v in persisted.get("settings", {}).items() if k in SETTINGS_DEFAULTS}}
         await self.platform.configure(self.settings)
         self.scheduler.reset()
+        self._apply_scheduler_settings(self.settings)
         for record in persisted.get("tokens", []):
             self.tokens.add(Token(**record))
         for record in persisted.get("printers", []):
@@ -162,6 +187,33 @@ class Engine:
         """Subscribes a transport to engine events and sends it a snapshot."""
         self._sinks.append(sink)
         sink(self.state_event())
+        self._stir()
+
+    @property
+    def subscribed(self) -> bool:
+        """Whether any transport is listening for events."""
+        return bool(self._sinks)
+
+    def _stir(self) -> None:
+        """Wakes background loops parked while the hub was idle, to re-check whether they have work."""
+        self._activity.set()
+        self._activity = asyncio.Event()
+
+    async def park(self, busy: Callable[[], bool], timeout: float | None = None) -> None:
+        """Waits until busy() holds, re-checking it whenever cameras, monitors, printers or sinks change.
+
+        Lets a background loop sleep without waking while the hub is idle.
+        Returns after timeout seconds regardless, when one is given.
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        while not busy():
+            remaining = None if deadline is None else deadline - self.clock()
+            if remaining is not None and remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._activity.wait(), remaining)
+            except TimeoutError:
+                return
 
     def remove_sink(self, sink: Callable[[dict[str, Any]], None]) -> None:
         """Unsubscribes a transport."""
@@ -273,35 +325,33 @@ class Engine:
         """Encodes the freshest frame of a camera as JPEG, or None if unavailable.
 
         Applies the camera's image pipeline (rotation, crop, adjustments) so the
-        snapshot matches the live view and the frame the model infers on.
+        snapshot matches the live view and the frame the model infers on. The
+        frame is grabbed as the scheduler grabs it and handed to the platform
+        with the camera's plan, which decodes, renders and encodes it off the
+        event loop.
         """
         camera = self.cameras.get(camera_id)
         if camera is None or camera.frame_source is None:
             return None
-        frame = await camera.frame_source.grab()
+        frame = await camera.frame_source.grab(luma=True)
         if frame is None:
             return None
-        rgb = vision.transform(
-            frame.rgb,
-            rotation=camera.rotation,
-            crop=camera.crop,
-            brightness=camera.brightness,
-            contrast=camera.contrast,
-            sharpness=camera.sharpness,
-        )
-        return await self.platform.encode_jpeg(rgb)
+        plan = camera.preprocess_plan(frame.pixels.shape, frame.limited)
+        return await self.platform.encode_jpeg(replace(frame, plan=plan))
 
     async def classify(self, data: bytes, sensitivity: float = 1.0) -> dict[str, Any]:
         """Classifies a supplied frame, returning the model's verdict and defect score.
 
         Decodes the image on the platform and runs the same inference the scheduler
         uses - the stateless equivalent of a camera's latest per-frame result, for a
-        frame the caller already holds rather than one PrintGuard pulls itself.
+        frame the caller already holds rather than one PrintGuard pulls itself. It
+        queues in the scheduler's user lane, behind live monitoring, and raises
+        InferenceBusy when turned away.
         """
         rgb = await self.platform.decode_jpeg(data)
         if rgb is None:
             raise RuntimeError("could not decode image")
-        result = await self.platform.infer(rgb)
+        result = await self.scheduler.infer(rgb)
         return {**result, "defect_score": vision.defect_score(result, sensitivity)}
 
     def _save(self) -> None:
@@ -344,6 +394,7 @@ class Engine:
         source.set_monitoring(camera.in_use)
         if source.fps > 0:
             camera.max_fps = source.fps
+        self.cameras.changed()
         logger.info("camera '%s' (%s) attached at %.1f fps", camera.name, camera.id, source.fps)
 
     def _schedule_attach(self, camera: Camera) -> None:
@@ -365,14 +416,21 @@ class Engine:
             return
         self.scheduler.cancel_camera(camera)
         camera.frame_source = None
+        self.cameras.changed()
         source.close()
         await self.platform.release_camera(camera.id, camera.source)
         if self.cameras.get(camera.id) is camera:
             self._schedule_attach(camera)
 
+    def _ticking(self) -> bool:
+        """Whether the ticker has work: a listener for state, a camera to reattach, or one in use."""
+        return self.subscribed or any(c.in_use or c.frame_source is None for c in self.cameras.values())
+
     async def _ticker(self) -> None:
+        """Reattaches dropped cameras and follows their native rates each tick, broadcasting state every `state_interval_s`."""
         tick = 0
         while True:
+            await self.park(self._ticking)
             await asyncio.sleep(STATE_TICK_S)
             tick += 1
             for camera in self.cameras.values():
@@ -381,7 +439,8 @@ class Engine:
                         self._schedule_attach(camera)
                 elif camera.frame_source.fps > 0:
                     camera.max_fps = camera.frame_source.fps
-            self.emit(self.state_event())
+            if tick % max(1, round(self.settings["state_interval_s"] / STATE_TICK_S)) == 0:
+                self.emit(self.state_event())
 
     async def _update_loop(self) -> None:
         """Refreshes the update status daily while the auto-check is enabled."""
@@ -414,6 +473,7 @@ class Engine:
         self.emit({"event": "error", "message": message})
 
     async def _on_result(self, camera: Camera, frame: Frame, result: dict[str, Any]) -> None:
+        risk = 0.0
         for monitor in self.monitors.values():
             if monitor["camera_id"] != camera.id or not monitor_watching(monitor, self.printers):
                 continue
@@ -422,8 +482,8 @@ class Engine:
             point = {"score": round(score, 4), "ts": ts}
             monitor_id = monitor["id"]
             self._results[monitor_id] = point
-            self.history.setdefault(monitor_id, MonitorHistory()).record(ts, score, monitor["threshold"])
-            emitted_at = time.monotonic()
+            self._history(monitor_id).record(ts, score, monitor["threshold"])
+            emitted_at = self.clock()
             if emitted_at - self._result_emitted_at.get(monitor_id, 0.0) >= RESULT_EVENT_INTERVAL_S:
                 self._result_emitted_at[monitor_id] = emitted_at
                 self.emit(
@@ -434,14 +494,19 @@ class Engine:
                         **point,
                         "prediction": "failure" if score >= monitor["threshold"] else "success",
                         "margin": round(result.get("margin", 0.0), 4),
-                        "ms": self.scheduler.stats()["infer_ms"],
+                        "ms": round(self.scheduler.infer_ms, 1),
                     }
                 )
             await self.watchdog.on_score(monitor, frame, score)
+            risk = max(risk, self.watchdog.risk(monitor, score))
+        camera.risk = risk
+
+    def _history(self, monitor_id: str) -> MonitorHistory:
+        return self.history.setdefault(monitor_id, MonitorHistory(self.settings["history_bucket_s"]))
 
     def note_alert(self, monitor_id: str, alert: dict[str, Any], jpeg: bytes | None) -> None:
         """Records a fired alert and its triggering frame in a monitor's history."""
-        self.history.setdefault(monitor_id, MonitorHistory()).record_alert(alert["ts"], alert["score"], alert["action"], jpeg)
+        self._history(monitor_id).record_alert(alert["ts"], alert["score"], alert["action"], jpeg)
 
     def monitor_snapshot(self, monitor_id: str, snap_id: str) -> bytes | None:
         """Returns a captured risky-moment snapshot's JPEG bytes, or None."""
@@ -492,6 +557,7 @@ class Engine:
         camera.sharpness = settings["sharpness"]
         camera.crop = settings["crop"]
         camera.rotation = settings["rotation"]
+        camera.plan = None
 
     async def _cmd_camera_remove(self, message: dict[str, Any]) -> None:
         camera = self.cameras.get(message["id"])
@@ -654,16 +720,67 @@ class Engine:
         except Exception as exc:
             self.emit({"event": "notify_test", "provider": adapter.id, "ok": False, "error": str(exc), "req_id": message.get("req_id")})
 
+    def _apply_scheduler_settings(self, settings: dict[str, Any]) -> None:
+        """Applies the scheduling settings, from start-up or an edit, to the scheduler and the runtime's batch window."""
+        self.scheduler.reuse_distance = float(settings["frame_reuse_distance"])
+        self.scheduler.inference_mode = settings["inference_mode"]
+        self.scheduler.on_demand_share = float(settings["on_demand_share"])
+        self.scheduler.quiet_period_s = float(settings["quiet_period_s"])
+        self.scheduler.budget = float(settings["inference_budget"])
+        self.scheduler.max_camera_fps = float(settings["max_camera_fps"])
+        self.scheduler.batch_window_s = float(settings["batch_window_ms"]) / 1000.0
+        self.platform.set_batch_window(self.scheduler.batch_window_s)
+
     async def _cmd_settings_update(self, message: dict[str, Any]) -> None:
         patch = {k: v for k, v in message.get("patch", {}).items() if k in SETTINGS_DEFAULTS}
-        settings = {**self.settings, **patch}
-        if settings["inference_runtime"] not in ("auto", "litert", "onnx"):
-            raise ValueError("inference runtime must be auto, litert or onnx")
+        profile = patch.get("power_profile", "custom")
+        if profile not in POWER_PROFILES and profile != "custom":
+            raise ValueError(f"power profile must be one of {', '.join(POWER_PROFILES)} or custom")
+        settings = {**self.settings, **POWER_PROFILES.get(profile, {}), **patch}
+        if settings["inference_runtime"] not in ("auto", "litert", "onnx", "process"):
+            raise ValueError("inference runtime must be auto, litert, onnx or process")
+        if settings["inference_mode"] not in ("auto", "latency", "throughput"):
+            raise ValueError("inference mode must be auto, latency or throughput")
+        window = settings["batch_window_ms"]
+        if isinstance(window, bool) or not isinstance(window, (int, float)) or not 0 <= window <= 50:
+            raise ValueError("batch window must be between 0 and 50 ms")
+        distance = settings["frame_reuse_distance"]
+        if isinstance(distance, bool) or not isinstance(distance, (int, float)) or not 0 <= distance <= 64:
+            raise ValueError("frame reuse distance must be between 0 and 64")
+        share = settings["on_demand_share"]
+        if isinstance(share, bool) or not isinstance(share, (int, float)) or not 0 < share <= 1:
+            raise ValueError("on-demand share must be above 0 and at most 1")
+        quiet = settings["quiet_period_s"]
+        if isinstance(quiet, bool) or not isinstance(quiet, (int, float)) or not 0 <= quiet <= 3600:
+            raise ValueError("quiet period must be between 0 and 3600 seconds")
+        budget = settings["inference_budget"]
+        if isinstance(budget, bool) or not isinstance(budget, (int, float)) or not 0.05 <= budget <= 1:
+            raise ValueError("inference budget must be between 0.05 and 1")
+        cap = settings["max_camera_fps"]
+        if isinstance(cap, bool) or not isinstance(cap, (int, float)) or not 0 <= cap <= 60:
+            raise ValueError("camera frame rate cap must be between 0 and 60")
+        interval = settings["state_interval_s"]
+        if isinstance(interval, bool) or not isinstance(interval, (int, float)) or not 1 <= interval <= 30:
+            raise ValueError("state interval must be between 1 and 30 seconds")
+        if isinstance(settings["history_bucket_s"], bool) or settings["history_bucket_s"] not in BUCKET_CHOICES:
+            raise ValueError(f"history resolution must be one of {', '.join(map(str, BUCKET_CHOICES))} seconds")
+        settings["history_bucket_s"] = int(settings["history_bucket_s"])
+        settings["power_profile"] = next(
+            (name for name, values in POWER_PROFILES.items() if all(settings[k] == v for k, v in values.items())), "custom"
+        )
         if settings["inference_runtime"] != self.settings["inference_runtime"]:
             await self.scheduler.reconfigure(lambda: self.platform.configure(settings))
         self.settings = settings
+        self._apply_scheduler_settings(settings)
+        for history in self.history.values():
+            history.bucket_s = settings["history_bucket_s"]
+        self.scheduler.invalidate()
         logger.info("settings updated: %s", sorted(patch))
 
+    async def _cmd_model_reload(self, message: dict[str, Any]) -> None:
+        await self.scheduler.reconfigure(lambda: self.platform.configure(self.settings))
+        logger.info("model reloaded on %s", self.platform.inference_device)
+
     async def _cmd_token_create(self, message: dict[str, Any]) -> None:
         name = str(message.get("name") or "token").strip() or "token"
         record, secret = new_token(name, message.get("scope") or "read")
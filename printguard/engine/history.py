@@ -1,6 +1,6 @@
 """Per-monitor risk history: rolled-up time buckets and alert snapshots.
 
-Each inference score is folded into a fixed-interval rollup bucket (count, sum,
+Each inference score is folded into a rollup bucket (count, sum,
 min, max and a defect tally); every fired alert is logged and keeps the JPEG of
 the frame that triggered it. Both series are bounded in-memory rings, read on
 demand by the detailed monitor view over the engine protocol; nothing here is
@@ -14,27 +14,43 @@ from collections import deque
 from typing import Any
 
 BUCKET_S = 60
+BUCKET_CHOICES = (60, 300, 900)
 BUCKET_CAP = 1440
 SNAP_CAP = 40
 ALERT_CAP = 50
 
 
 class MonitorHistory:
-    """Bounded rollup buckets and alert snapshots for one monitor."""
+    """Bounded rollup buckets and alert snapshots for one monitor.
 
-    def __init__(self) -> None:
+    Attributes:
+        bucket_s: Width of each rollup bucket. A coarser resolution keeps a
+            longer history in the same memory; a change applies from the next
+            bucket opened.
+    """
+
+    def __init__(self, bucket_s: int = BUCKET_S) -> None:
+        self.bucket_s = bucket_s
         self.buckets: deque[dict[str, Any]] = deque(maxlen=BUCKET_CAP)
         self.snaps: deque[dict[str, Any]] = deque(maxlen=SNAP_CAP)
         self.alerts: deque[dict[str, Any]] = deque(maxlen=ALERT_CAP)
         self._last_score = 0.0
 
     def record(self, ts: float, score: float, threshold: float) -> None:
-        """Folds one inference score into its fixed-interval bucket."""
+        """Folds one inference score into its bucket.
+
+        The open bucket keeps its width until it ends, so a resolution change
+        never reorders or overlaps buckets. The first bucket at a new width is
+        cut short to end on that width's boundary.
+        """
         self._last_score = score
-        start = int(ts // BUCKET_S) * BUCKET_S
         bucket = self.buckets[-1] if self.buckets else None
-        if bucket is None or bucket["t"] != start:
-            bucket = {"t": start, "n": 0, "sum": 0.0, "min": score, "max": score, "defects": 0}
+        if bucket is None or ts >= bucket["t"] + bucket["s"]:
+            start = int(ts // self.bucket_s) * self.bucket_s
+            end = start + self.bucket_s
+            if bucket is not None:
+                start = max(start, bucket["t"] + bucket["s"])
+            bucket = {"t": start, "s": end - start, "n": 0, "sum": 0.0, "min": score, "max": score, "defects": 0}
             self.buckets.append(bucket)
         bucket["n"] += 1
         bucket["sum"] += score
@@ -71,7 +87,7 @@ class MonitorHistory:
             "defect_frames": defect_frames,
             "defect_pct": round(100.0 * defect_frames / inferences, 1) if inferences else 0.0,
             "alerts": len(self.alerts),
-            "watch_min": sum(1 for b in buckets if b["n"] > 0),
+            "watch_min": sum(b["s"] for b in buckets if b["n"] > 0) // 60,
             "snaps": len(self.snaps),
         }
         return {
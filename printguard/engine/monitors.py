@@ -22,11 +22,12 @@ MONITOR_DEFAULTS: dict[str, Any] = {
     "notify": False,
     "on_defect": "none",
     "cooldown_s": 60,
+    "detect_within_s": 0,
 }
 
 STANDBY_STATUSES = ("idle", "paused", "error")
 
-_CLAMPS = {"threshold": (0.05, 1.0), "sensitivity": (0.2, 5.0), "consecutive": (1, 30), "cooldown_s": (0, 600)}
+_CLAMPS = {"threshold": (0.05, 1.0), "sensitivity": (0.2, 5.0), "consecutive": (1, 30), "cooldown_s": (0, 600), "detect_within_s": (0, 600)}
 
 
 def monitor_watching(monitor: dict[str, Any], printers: "PrinterRegistry") -> bool:
@@ -46,6 +47,17 @@ def monitor_watching(monitor: dict[str, Any], printers: "PrinterRegistry") -> bo
     return not state or state["status"] not in STANDBY_STATUSES
 
 
+def required_fps(monitor: dict[str, Any]) -> float:
+    """The inference rate a monitor needs to act within its detection deadline.
+
+    A streak of `consecutive` flagged frames must fit inside `detect_within_s`,
+    so the camera has to be checked that many times in that window. Zero when
+    the monitor sets no deadline.
+    """
+    within = monitor.get("detect_within_s") or 0
+    return monitor["consecutive"] / within if within > 0 else 0.0
+
+
 def _clamp(key: str, value: float) -> float:
     low, high = _CLAMPS[key]
     return max(low, min(high, value))
@@ -68,6 +80,7 @@ def sanitise_monitor(monitor_id: str, patch: dict[str, Any], base: dict[str, Any
     record["sensitivity"] = _clamp("sensitivity", float(record["sensitivity"]))
     record["consecutive"] = int(_clamp("consecutive", int(record["consecutive"])))
     record["cooldown_s"] = int(_clamp("cooldown_s", int(record["cooldown_s"])))
+    record["detect_within_s"] = _clamp("detect_within_s", float(record.get("detect_within_s") or 0))
     record["enabled"] = bool(record["enabled"])
     record["notify"] = bool(record["notify"])
     if record["on_defect"] not in ("none", "pause", "cancel"):
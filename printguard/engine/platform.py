@@ -6,26 +6,52 @@ protocols; everything that consumes them is shared code.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Protocol
+from dataclasses import dataclass, field
+from typing import Any, Callable, Protocol
 
 import numpy as np
 
+from .vision import Plan
+
+BATCH_WINDOW_S = 0.01
+"""How long a frame waits by default for others to share its model call."""
+
 
 @dataclass
 class Frame:
     """A single captured video frame.
 
     Attributes:
-        rgb: HxWx3 uint8 frame in RGB channel order.
+        rgb: HxWx3 uint8 frame in RGB channel order, or None for a frame
+            grabbed as luminance until view() decodes it.
         seq: Monotonic identity of the frame; equal seq means equal frame,
             which the scheduler uses to never infer the same frame twice.
         ts: Capture wall-clock time in seconds.
+        plan: The camera pipeline rgb has yet to go through, or None when rgb
+            is already what the camera shows.
+        luma: HxW uint8 luminance plane when grabbed for inference from a
+            source that has one without converting to RGB, else None.
+        limited: Whether luma uses video levels, 16 to 235.
+        decode: Produces rgb on demand for a frame grabbed as luminance.
     """
 
-    rgb: np.ndarray
+    rgb: np.ndarray | None
     seq: float
     ts: float
+    plan: Plan | None = None
+    luma: np.ndarray | None = None
+    limited: bool = False
+    decode: Callable[[], np.ndarray] | None = field(default=None, repr=False)
+
+    @property
+    def pixels(self) -> np.ndarray:
+        """The cheapest image the model can read: luma where grabbed, else rgb."""
+        return self.luma if self.luma is not None else self.rgb
+
+    def view(self) -> np.ndarray:
+        """Returns the frame as the camera's live view shows it."""
+        rgb = self.rgb if self.rgb is not None else self.decode()
+        return rgb if self.plan is None else self.plan.render(rgb)
 
 
 class FrameSource(Protocol):
@@ -35,8 +61,12 @@ class FrameSource(Protocol):
     online: bool
     standby: bool
 
-    async def grab(self) -> Frame | None:
-        """Returns the freshest available frame, or None if not ready."""
+    async def grab(self, luma: bool = False) -> Frame | None:
+        """Returns the freshest available frame, or None if not ready.
+
+        With luma, a source that decodes to YUV may return the luminance plane
+        in place of RGB, decoding RGB only if the frame is later viewed.
+        """
         ...
 
     def set_monitoring(self, active: bool) -> None:
@@ -53,6 +83,9 @@ class Platform(Protocol):
 
     mode: str
     workers: int
+    """Frames the platform can infer at once: worker count times batch size.
+    May change while monitoring runs; the scheduler reads it on every dispatch."""
+
     inference_device: str
     version: str
     update_repo: str | None
@@ -64,11 +97,36 @@ class Platform(Protocol):
     installer), or None when the deployment updates outside the app."""
 
     async def configure(self, settings: dict[str, Any]) -> None:
-        """Applies platform-owned settings before inference starts."""
+        """Applies platform-owned settings, before inference starts or while it runs.
+
+        Called again on a runtime change or a model reload, it must keep
+        answering infer() until the replacement is ready.
+        """
         ...
 
-    async def infer(self, rgb: np.ndarray) -> dict[str, Any]:
-        """Runs the model on an RGB frame and returns a classify() result."""
+    def set_inference_mode(self, mode: str) -> None:
+        """Tunes inference for ``"throughput"`` across many cameras or ``"latency"`` on one.
+
+        Applies from the next frame. The scheduler calls it whenever the mode it
+        wants changes and again after every configure(); a platform with only
+        one way to run the model ignores it.
+        """
+        ...
+
+    def set_batch_window(self, seconds: float) -> None:
+        """Sets how long a frame may wait for others to share its model call.
+
+        Applies from the next frame and carries over to a runtime configure()
+        builds; a platform that runs one frame per call ignores it.
+        """
+        ...
+
+    async def infer(self, rgb: np.ndarray, plan: Plan | None = None) -> dict[str, Any]:
+        """Runs the model on an RGB frame or luminance plane and returns a classify() result.
+
+        A plan applies the camera's pipeline while preprocessing, in place of
+        transforming the full frame first.
+        """
         ...
 
     async def discover_cameras(self) -> list[dict[str, Any]]:
@@ -96,8 +154,13 @@ class Platform(Protocol):
         """Performs an HTTP request and returns (status, parsed body)."""
         ...
 
-    async def encode_jpeg(self, rgb: np.ndarray) -> bytes | None:
-        """Encodes an RGB frame as JPEG for alert snapshots."""
+    async def encode_jpeg(self, frame: Frame) -> bytes | None:
+        """Encodes a frame as JPEG, as its view() shows it, for snapshots and alerts.
+
+        Decoding RGB, applying the camera's pipeline and encoding are pixel work
+        on a full-resolution frame, so a platform with threads does them together
+        off the event loop.
+        """
         ...
 
     async def decode_jpeg(self, data: bytes) -> np.ndarray | None:
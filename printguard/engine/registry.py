@@ -5,12 +5,14 @@ runtime state."""
 from __future__ import annotations
 
 import logging
-import time
 from dataclasses import dataclass, field
-from typing import Any, Generic, Protocol, TypeVar
+from typing import Any, Callable, Generic, Protocol, TypeVar
 
+import numpy as np
+
+from . import vision
 from .cameras import CAMERA_DEFAULTS
-from .monitors import monitor_watching
+from .monitors import monitor_watching, required_fps
 from .platform import FrameSource
 
 logger = logging.getLogger(__name__)
@@ -69,6 +71,24 @@ class Camera:
         inferring: Whether an inference on this camera is in flight.
         in_use: Whether an enabled monitor is bound to this camera.
         online: Whether the frame source is currently delivering frames.
+        plan: Image pipeline compiled for the last frame size seen; cleared
+            whenever the pipeline settings change.
+        signature: Coarse summary of the last frame the model actually ran
+            on, which later near-identical frames reuse the result of.
+        signature_at: When that frame was inferred, on the monotonic clock.
+        reuse_rate: Smoothed share of frames answered from the last result.
+        motion_signature: Signature of the frame at the last change in view.
+        still_since: When the view last changed, on the monotonic clock.
+        service_ms: Smoothed time to grab, prepare and infer one of this
+            camera's frames, which the scheduler charges its share in.
+        quiet: Whether the view has not changed for the quiet period, which
+            caps the camera's rate at a floor.
+        risk: How urgently the camera needs fresh frames, in [0, 1], from the
+            latest scores of the monitors watching it. The scheduler weights
+            its share of capacity by it.
+        min_fps: Rate reserved for the camera before capacity is shared out,
+            the highest any monitor watching it needs to act within its
+            detection deadline.
     """
 
     id: str
@@ -90,6 +110,16 @@ class Camera:
     last_done: float = 0.0
     last_result: dict[str, Any] | None = None
     frame_source: FrameSource | None = field(default=None, repr=False)
+    plan: vision.Plan | None = field(default=None, repr=False)
+    signature: np.ndarray | None = field(default=None, repr=False)
+    signature_at: float = 0.0
+    reuse_rate: float = 0.0
+    risk: float = 0.0
+    motion_signature: np.ndarray | None = field(default=None, repr=False)
+    still_since: float = 0.0
+    service_ms: float = 0.0
+    quiet: bool = False
+    min_fps: float = 0.0
 
     @property
     def online(self) -> bool:
@@ -101,9 +131,23 @@ class Camera:
         """Whether capture is intentionally sleeping until it is needed."""
         return self.frame_source is not None and self.frame_source.standby
 
-    def mark_inferred(self, result: dict[str, Any]) -> None:
-        """Records a completed inference and updates the achieved rate."""
-        now = time.monotonic()
+    def preprocess_plan(self, shape: tuple[int, ...], limited: bool = False) -> vision.Plan:
+        """Returns the compiled image pipeline for frames of this shape and levels, compiling it if stale."""
+        if self.plan is None or self.plan.shape != shape[:2] or self.plan.limited != limited:
+            self.plan = vision.compile_plan(
+                shape,
+                rotation=self.rotation,
+                crop=self.crop,
+                brightness=self.brightness,
+                contrast=self.contrast,
+                sharpness=self.sharpness,
+                limited=limited,
+            )
+            self.signature = self.motion_signature = None
+        return self.plan
+
+    def mark_inferred(self, result: dict[str, Any], now: float) -> None:
+        """Records a completed inference at `now`, on the scheduler's clock, and updates the achieved rate."""
         if self.last_done:
             inst = 1.0 / max(1e-6, now - self.last_done)
             self.achieved_fps = inst if not self.achieved_fps else 0.75 * self.achieved_fps + 0.25 * inst
@@ -120,6 +164,10 @@ class Camera:
             "max_fps": round(self.max_fps, 2),
             "target_fps": round(self.target_fps, 2),
             "achieved_fps": round(self.achieved_fps, 2),
+            "risk": round(self.risk, 2),
+            "quiet": self.quiet,
+            "service_ms": round(self.service_ms, 1),
+            "min_fps": round(self.min_fps, 2),
             "inferring": self.inferring,
             "in_use": self.in_use,
             "online": self.online,
@@ -229,12 +277,31 @@ class Token:
 class CameraRegistry(Registry[Camera]):
     """Holds all registered cameras keyed by id."""
 
+    def __init__(self) -> None:
+        super().__init__()
+        self._listeners: list[Callable[[], None]] = []
+
+    def watch(self, listener: Callable[[], None]) -> None:
+        """Calls listener whenever the set of schedulable cameras may have changed."""
+        self._listeners.append(listener)
+
+    def changed(self) -> None:
+        """Tells watchers that cameras changed, e.g. after a frame source is attached or released."""
+        for listener in self._listeners:
+            listener()
+
+    def add(self, item: Camera) -> None:
+        """Registers a camera."""
+        super().add(item)
+        self.changed()
+
     def remove(self, camera_id: str) -> Camera | None:
         """Deregisters a camera, closing its frame source."""
         camera = super().remove(camera_id)
         if camera and camera.frame_source:
             camera.frame_source.close()
             camera.frame_source = None
+        self.changed()
         return camera
 
     def schedulable(self) -> list[Camera]:
@@ -242,12 +309,25 @@ class CameraRegistry(Registry[Camera]):
         return [c for c in self.values() if c.in_use and c.online]
 
     def sync_in_use(self, monitors: dict[str, dict[str, Any]], printers: "PrinterRegistry") -> None:
-        """Recomputes in_use flags from the monitors currently watching."""
-        bound = {m["camera_id"] for m in monitors.values() if monitor_watching(m, printers)}
+        """Recomputes in_use flags from the monitors currently watching.
+
+        A camera coming into use starts with its view counted as changing, so
+        a print that begins under a still view is not held at the quiet rate.
+        Each camera's reserved rate follows the strictest detection deadline
+        among the monitors watching it.
+        """
+        bound: dict[str, float] = {}
+        for monitor in monitors.values():
+            if monitor_watching(monitor, printers):
+                bound[monitor["camera_id"]] = max(bound.get(monitor["camera_id"], 0.0), required_fps(monitor))
         for camera in self.values():
+            if camera.id in bound and not camera.in_use:
+                camera.motion_signature, camera.quiet = None, False
             camera.in_use = camera.id in bound
+            camera.min_fps = bound.get(camera.id, 0.0)
             if camera.frame_source:
                 camera.frame_source.set_monitoring(camera.in_use)
+        self.changed()
 
 
 class PrinterRegistry(Registry[Printer]):
@@ -1,99 +1,394 @@
 """Demand-driven inference scheduling with max-min fair rate allocation.
 
 Capacity is never benchmarked up front: a smoothed estimate of observed
-inference latency continuously yields the sustainable total rate, which is
-water-filled across cameras so no camera is allocated beyond its native
-frame rate and spare capacity flows to cameras that can use it. Frames are
-grabbed at dispatch time and identified by sequence, so a frame is never
-inferred twice and results always describe the present.
+inference latency continuously yields the sustainable total rate, and a
+configured budget share of it is water-filled across cameras so no camera is
+allocated beyond its native frame rate and spare capacity flows to cameras that
+can use it. Frames are grabbed at dispatch time and identified by sequence, so
+a frame is never inferred twice and results always describe the present.
+Cameras falling due within a short window of each other are dispatched
+together, so a platform that batches frames can stack them into one model call.
+A frame that barely differs from the last one the model ran on reuses that
+result instead, and the capacity it saves flows back into the water-fill. A
+reused frame is served but never reported as a result, so one model call
+counts once toward a defect streak, and no camera carrying risk reuses. A
+camera whose view has not changed for a quiet period is capped at a floor rate
+until it changes again. Each camera's share is weighted by its risk, so one
+whose score nears a monitor's threshold, or whose defect streak is under way,
+bursts toward its native rate until the suspicion is confirmed or cleared,
+taking the frames from cameras that look fine. A camera whose monitor must act
+within a deadline has the rate that needs reserved before the rest is shared
+out. A lone camera has the platform tuned for latency rather than throughput,
+since nothing else competes for the capacity.
+
+A worker slot is held only for the model call. Up to PREFETCH_DEPTH frames
+per worker are grabbed and checked for reuse while the model runs on others,
+so grabbing and converting frames overlaps inference and the measured latency,
+and the capacity derived from it, is the model's service time alone.
+
+Dispatch is event driven. Cameras wait in a heap keyed on when they next fall
+due, and the loop sleeps until the earliest deadline, a freed worker, an
+on-demand frame or a change to the cameras, so a wake-up costs the cameras it
+dispatches rather than every camera registered. Allocation is recomputed when
+the cameras or a camera's risk or limit change, and when capacity, cost or
+service time drift past their tolerances, at most once a second for those.
+
+Frames submitted on demand, such as a user's classify request, queue in lower
+priority lanes behind live monitoring: they take a worker only while no camera
+is due, and together never hold more than a configured share of the workers.
 """
 
 from __future__ import annotations
 
 import asyncio
+import heapq
+import itertools
 import logging
 import time
-from typing import Any, Awaitable, Callable
+from collections import deque
+from dataclasses import replace
+from typing import Any, Awaitable, Callable, Literal
+
+import numpy as np
 
 from . import vision
-from .platform import Frame, Platform
+from .platform import BATCH_WINDOW_S, Frame, Platform
 from .registry import Camera, CameraRegistry
 
 logger = logging.getLogger(__name__)
 
 LATENCY_SMOOTHING = 0.25
-IDLE_POLL_S = 0.05
-DISPATCH_POLL_S = 0.005
+SYNC_S = 1.0
+ALLOCATION_TOLERANCE = 0.02
+CAPACITY_TOLERANCE = 0.05
+SERVICE_TOLERANCE = 0.1
+DRIFT_INTERVAL_S = 1.0
+PREFETCH_DEPTH = 2
 STALE_RETRY_S = 0.1
 ERROR_THROTTLE_S = 30.0
+REUSE_MAX_AGE_S = 10.0
+REUSE_SMOOTHING = 0.1
+REUSE_MIN_COST = 0.05
+QUIET_FPS = 0.5
+QUIET_DISTANCE = 4.0
+LATENCY_MODE_MAX_CAMERAS = 1
+RISK_BOOST = 7.0
+RESERVE_SHARE = 0.8
+LANE_QUEUE_LIMIT = 16
+LANE_WAIT_S = 10.0
 
 ResultSink = Callable[[Camera, Frame, dict[str, Any]], Awaitable[None]]
 ErrorSink = Callable[[str], None]
+Clock = Callable[[], float]
+"""Monotonic seconds; time.monotonic in service, the event loop's virtual time in simulation."""
+Lane = Literal["user", "background"]
+LANES: tuple[Lane, ...] = ("user", "background")
+"""On-demand lanes below live monitoring, highest priority first."""
+
+
+class InferenceBusy(RuntimeError):
+    """An on-demand frame was turned away to keep workers free for live monitoring."""
 
 
 class Scheduler:
     """Allocates inference slots across registered cameras."""
 
-    def __init__(self, platform: Platform, registry: CameraRegistry, on_result: ResultSink, on_error: ErrorSink) -> None:
+    def __init__(
+        self,
+        platform: Platform,
+        registry: CameraRegistry,
+        on_result: ResultSink,
+        on_error: ErrorSink,
+        clock: Clock = time.monotonic,
+    ) -> None:
         self._platform = platform
+        self._clock = clock
         self._registry = registry
         self._on_result = on_result
         self._on_error = on_error
         self._last_error_at = 0.0
-        self._dispatch_lock = asyncio.Lock()
+        self._reconfigure_lock = asyncio.Lock()
         self._jobs: set[asyncio.Task[None]] = set()
         self._camera_jobs: dict[str, asyncio.Task[None]] = {}
-        self._slots = asyncio.Semaphore(platform.workers)
+        self._active = 0
+        self._in_flight = 0
+        self._in_model = 0
+        self._slot_freed = asyncio.Event()
+        self._wake = asyncio.Event()
+        self._waiting: dict[Lane, deque[asyncio.Future[None]]] = {lane: deque() for lane in LANES}
+        self._on_demand = 0
+        self._rejected: dict[Lane, int] = dict.fromkeys(LANES, 0)
         self.infer_ms = 0.0
+        self.reuse_distance = 0.0
+        self.quiet_period_s = 0.0
+        self.quiet_saved_fps = 0.0
+        self.inference_mode = "auto"
+        self.on_demand_share = 0.25
+        self.budget = 1.0
+        self.max_camera_fps = 0.0
+        self.batch_window_s = BATCH_WINDOW_S
+        self._mode: str | None = None
+        self._queue: list[tuple[float, int, Camera]] = []
+        self._order = itertools.count()
+        self._cameras: dict[str, Camera] = {}
+        self._stale = True
+        self._reallocate = True
+        self._synced_at = 0.0
+        self._watching = False
+        self._allocated: tuple[float, dict[str, tuple[float, float, float]]] = (0.0, {})
+        self._allocated_at = 0.0
+        registry.watch(self.invalidate)
 
     def reset(self) -> None:
-        """Resets concurrency and latency after the inference runtime changes."""
-        self._slots = asyncio.Semaphore(self._platform.workers)
+        """Resets latency after the inference runtime changes, and re-applies the inference mode to it.
+
+        Concurrency needs no reset: every dispatch reads the platform's current
+        worker count, so a pool that grows or shrinks at runtime takes effect on
+        the next frame without draining the ones in flight.
+        """
         self.infer_ms = 0.0
+        self._mode = None
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Re-reads the cameras, inference mode and allocation on the next pass, and wakes dispatch."""
+        self._stale = True
+        self._reallocate = True
+        self._wake.set()
 
     async def reconfigure(self, configure: Callable[[], Awaitable[None]]) -> None:
-        """Drains active work and applies a new inference configuration."""
-        async with self._dispatch_lock:
-            if self._jobs:
-                await asyncio.gather(*self._jobs)
+        """Applies a new inference configuration while dispatch carries on.
+
+        The platform builds the new runtime beside the one serving and swaps
+        them when it is ready, so frames keep flowing throughout. Reconfigurations
+        run one at a time, and latency is re-learned once the new runtime is live.
+        """
+        async with self._reconfigure_lock:
             await configure()
             self.reset()
 
     def capacity_fps(self) -> float:
-        """Total sustainable inferences per second given observed latency."""
+        """Total inferences per second to allocate: the budgeted share of what observed latency sustains.
+
+        A budget below one leaves the rest of the workers' time to other
+        services on the host.
+        """
         if self.infer_ms <= 0:
             return 0.0
-        return self._platform.workers * 1000.0 / self.infer_ms
+        return self.budget * self._platform.workers * 1000.0 / self.infer_ms
 
     def stats(self) -> dict[str, Any]:
         """Live scheduler statistics for the state event."""
+        cameras = self._registry.schedulable()
+        served_fps = sum(c.achieved_fps for c in cameras)
+        reused_fps = sum(c.achieved_fps * c.reuse_rate for c in cameras)
         return {
             "inference_device": self._platform.inference_device,
+            "inference_mode": self._mode or "throughput",
             "infer_ms": round(self.infer_ms, 1),
             "capacity_fps": round(self.capacity_fps(), 2),
+            "reuse_rate": round(reused_fps / served_fps, 3) if served_fps else 0.0,
+            "reused_fps": round(reused_fps, 2),
+            "quiet_cameras": sum(c.quiet for c in cameras),
+            "quiet_saved_fps": round(self.quiet_saved_fps, 2),
+            "queued": {lane: sum(not ticket.done() for ticket in self._waiting[lane]) for lane in LANES},
+            "rejected": dict(self._rejected),
         }
 
     def allocate(self) -> None:
         """Water-fills capacity into per-camera target rates.
 
-        Cameras are visited in ascending order of native frame rate; each
-        takes the smaller of its native rate and an equal share of what
-        remains, releasing any surplus to faster cameras. Until the first
-        latency observation exists, targets fall back to native rates and
-        the worker semaphore alone provides backpressure.
+        Cameras are visited in ascending order of the capacity their native
+        frame rate would use per unit of weight; each takes the smaller of its
+        native rate and its weighted share of what remains, releasing any
+        surplus to the rest. A camera weighs 1 + RISK_BOOST * risk, so one under
+        suspicion takes up to eight times the share of a clean one.
+
+        Shares are in processing time, not frames. Capacity counts frames at
+        the fleet's average service time, and each camera's frames are charged
+        its own service time relative to that average, so a camera that is
+        slow to grab and infer gets fewer frames rather than taking them from
+        the rest. A camera also pays only for the frames the model actually
+        runs on, so one whose frames mostly repeat gets a higher rate for the
+        same share. A quiet camera's native rate is capped at QUIET_FPS, and
+        the rate it would otherwise draw is reported as saved. A native rate is
+        also capped at `max_camera_fps` when that is set.
+
+        A camera with a reserved rate, from a monitor's detection deadline, is
+        held at it when its share would fall short, and the rest is water-filled
+        across the others. Reservations together take at most RESERVE_SHARE of
+        capacity; beyond that they are scaled down alike, and the watchdog
+        warns for the monitors left short.
+
+        A raised target takes effect from the last frame rather than waiting
+        out the interval set at the old rate. Until the first latency
+        observation exists, targets fall back to native rates and the worker
+        semaphore alone provides backpressure.
         """
-        cameras = self._registry.schedulable()
+        cameras = [c for c in self._cameras.values() if c.in_use and c.online]
+        remaining = self.capacity_fps()
+        served = [c for c in cameras if c.service_ms > 0]
+        rate = sum(c.achieved_fps for c in served)
+        mean_ms = sum(c.achieved_fps * c.service_ms for c in served) / rate if rate else 0.0
+        costs = {
+            c.id: max(REUSE_MIN_COST, 1.0 - c.reuse_rate) * (c.service_ms / mean_ms if mean_ms and c.service_ms else 1.0)
+            for c in cameras
+        }
+        self._allocated_at = self._clock()
+        self._allocated = (remaining, {c.id: (max(REUSE_MIN_COST, 1.0 - c.reuse_rate), c.service_ms, c.risk) for c in cameras})
+        native = {c.id: min(c.max_fps, self.max_camera_fps) if self.max_camera_fps else c.max_fps for c in cameras}
+        limits = {c.id: min(native[c.id], QUIET_FPS) if c.quiet else native[c.id] for c in cameras}
+        self.quiet_saved_fps = 0.0
         if not cameras:
             return
-        remaining = self.capacity_fps()
         if remaining <= 0:
             for camera in cameras:
-                camera.target_fps = camera.max_fps
+                camera.target_fps = limits[camera.id]
             return
-        for index, camera in enumerate(sorted(cameras, key=lambda c: c.max_fps)):
-            share = remaining / (len(cameras) - index)
-            camera.target_fps = min(camera.max_fps, share)
-            remaining -= camera.target_fps
+        capacity = remaining
+        weights = {c.id: 1.0 + RISK_BOOST * c.risk for c in cameras}
+        floors = {c.id: min(c.min_fps, limits[c.id]) for c in cameras if c.min_fps > 0}
+        reserved = sum(rate * costs[cid] for cid, rate in floors.items())
+        if reserved > RESERVE_SHARE * capacity:
+            floors = {cid: rate * RESERVE_SHARE * capacity / reserved for cid, rate in floors.items()}
+        pinned: dict[str, float] = {}
+        while True:
+            left = capacity - sum(rate * costs[cid] for cid, rate in pinned.items())
+            targets = self._fill([c for c in cameras if c.id not in pinned], left, limits, costs, weights)
+            short = {cid: floors[cid] for cid, target in targets.items() if target < floors.get(cid, 0.0)}
+            if not short:
+                break
+            pinned.update(short)
+        targets.update(pinned)
+        for camera in cameras:
+            target = targets[camera.id]
+            if target > camera.target_fps and camera.last_done and not camera.inferring:
+                sooner = camera.last_done + 1.0 / target
+                if sooner < camera.next_due:
+                    camera.next_due = sooner
+                    self._enqueue(camera)
+            camera.target_fps = target
+        held = sum((native[c.id] - c.target_fps) * costs[c.id] for c in cameras if c.quiet)
+        self.quiet_saved_fps = min(held, capacity)
+
+    @staticmethod
+    def _fill(
+        cameras: list[Camera], capacity: float, limits: dict[str, float], costs: dict[str, float], weights: dict[str, float]
+    ) -> dict[str, float]:
+        """Water-fills capacity across cameras, returning each one's target rate."""
+        targets: dict[str, float] = {}
+        weight_left = sum(weights[c.id] for c in cameras)
+        for camera in sorted(cameras, key=lambda c: limits[c.id] * costs[c.id] / weights[c.id]):
+            share = max(0.0, capacity) * weights[camera.id] / weight_left
+            targets[camera.id] = min(limits[camera.id], share / costs[camera.id])
+            capacity -= targets[camera.id] * costs[camera.id]
+            weight_left -= weights[camera.id]
+        return targets
+
+    def _drifted(self, camera: Camera, now: float) -> bool:
+        """Whether the allocation is out of date after one of a camera's frames.
+
+        A risk change, or the first capacity estimate, counts at once. Capacity,
+        reuse cost and service time follow smoothed measurements that jitter
+        from frame to frame, so they count only past their tolerances and at
+        most once every DRIFT_INTERVAL_S.
+        """
+        capacity, inputs = self._allocated
+        cost, service_ms, risk = inputs.get(camera.id, (-1.0, -1.0, -1.0))
+        if abs(camera.risk - risk) > ALLOCATION_TOLERANCE or (not capacity and self.infer_ms > 0):
+            return True
+        return now - self._allocated_at >= DRIFT_INTERVAL_S and (
+            abs(self.capacity_fps() - capacity) > CAPACITY_TOLERANCE * capacity
+            or abs(max(REUSE_MIN_COST, 1.0 - camera.reuse_rate) - cost) > ALLOCATION_TOLERANCE
+            or abs(camera.service_ms - service_ms) > SERVICE_TOLERANCE * service_ms
+        )
+
+    def tune(self) -> None:
+        """Asks the platform for the inference mode the setting and camera count call for.
+
+        Automatic mode wants latency while at most `LATENCY_MODE_MAX_CAMERAS`
+        cameras are scheduled and throughput beyond that. The platform is only
+        called when the wanted mode changes.
+        """
+        mode = self.inference_mode
+        if mode == "auto":
+            mode = "latency" if len(self._cameras) <= LATENCY_MODE_MAX_CAMERAS else "throughput"
+        if mode != self._mode:
+            self._mode = mode
+            self._platform.set_inference_mode(mode)
+
+    async def infer(self, rgb: np.ndarray, plan: vision.Plan | None = None, lane: Lane = "user") -> dict[str, Any]:
+        """Runs a frame submitted on demand through the model, behind live monitoring.
+
+        The frame waits in its lane until the dispatch loop admits it. That needs
+        a free worker and no camera due, and the on-demand lanes must hold fewer
+        than `on_demand_share` of the workers, with at least one always open to
+        them. The user lane is admitted before the background lane.
+
+        Raises:
+            InferenceBusy: When the lane already holds `LANE_QUEUE_LIMIT` frames, or
+                the frame waited `LANE_WAIT_S` without being admitted.
+        """
+        waiting = self._waiting[lane]
+        if sum(not ticket.done() for ticket in waiting) >= LANE_QUEUE_LIMIT:
+            self._rejected[lane] += 1
+            raise InferenceBusy(f"inference is busy with live monitoring; {lane} queue is full")
+        ticket: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        waiting.append(ticket)
+        self._wake.set()
+        try:
+            await asyncio.wait_for(ticket, LANE_WAIT_S)
+        except asyncio.CancelledError:
+            if not ticket.cancelled():
+                self._on_demand -= 1
+                self._release()
+            raise
+        except TimeoutError:
+            if ticket.cancelled():
+                self._rejected[lane] += 1
+                raise InferenceBusy(
+                    f"inference is busy with live monitoring; no worker freed within {LANE_WAIT_S:.0f}s"
+                ) from None
+        try:
+            return await self._platform.infer(rgb, plan)
+        finally:
+            self._on_demand -= 1
+            self._release()
+
+    def _admit_on_demand(self) -> bool:
+        """Hands a free worker to the oldest frame in the highest lane with one waiting, within the share.
+
+        Camera frames still being grabbed count against the free workers, since
+        each will want one in a moment.
+        """
+        workers = max(1, self._platform.workers)
+        pending = self._in_flight - self._in_model
+        if self._active + pending >= workers or self._on_demand >= max(1, int(workers * self.on_demand_share)):
+            return False
+        for lane in LANES:
+            waiting = self._waiting[lane]
+            while waiting:
+                ticket = waiting.popleft()
+                if ticket.done():
+                    continue
+                ticket.set_result(None)
+                self._active += 1
+                self._on_demand += 1
+                return True
+        return False
+
+    async def _take_slot(self) -> None:
+        """Waits for a worker for a camera frame that is ready for the model."""
+        while self._active >= max(1, self._platform.workers):
+            self._slot_freed.clear()
+            await self._slot_freed.wait()
+        self._active += 1
+        self._in_model += 1
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._slot_freed.set()
+        self._wake.set()
 
     def cancel_camera(self, camera: Camera) -> None:
         """Cancels the active inference job for a restarted camera."""
@@ -101,69 +396,191 @@ class Scheduler:
             task.cancel()
 
     async def run(self) -> None:
-        """Dispatch loop: hands the most overdue camera to a free worker."""
+        """Dispatch loop: hands the most overdue camera to a free worker.
+
+        Cameras are re-read when the registry reports a change, and every
+        SYNC_S while any is in use, since a source goes online or offline
+        without telling the scheduler.
+        """
         while True:
-            async with self._dispatch_lock:
+            self._wake.clear()
+            now = self._clock()
+            if self._stale or now - self._synced_at >= SYNC_S:
+                self._sync(now)
+            if self._reallocate:
+                self._reallocate = False
                 self.allocate()
-                now = time.monotonic()
-                due = [c for c in self._registry.schedulable() if not c.inferring and now >= c.next_due]
-                if due:
-                    camera = min(due, key=lambda c: c.next_due)
-                    await self._slots.acquire()
-                    camera.inferring = True
-                    camera.next_due = time.monotonic() + 1.0 / max(0.1, camera.target_fps or camera.max_fps)
-                    task = asyncio.create_task(self._job(camera))
-                    self._jobs.add(task)
-                    task.add_done_callback(self._jobs.discard)
-                    self._camera_jobs[camera.id] = task
-
-                    def forget(done: asyncio.Task[None], camera_id: str = camera.id) -> None:
-                        if self._camera_jobs.get(camera_id) is done:
-                            self._camera_jobs.pop(camera_id)
-
-                    task.add_done_callback(forget)
-                    continue
-                sleep_s = self._sleep_until_due(now)
-            await asyncio.sleep(sleep_s)
+            saturated = self._in_flight >= PREFETCH_DEPTH * max(1, self._platform.workers)
+            camera = None if saturated else self._pop_due(now)
+            if camera is not None:
+                self._in_flight += 1
+                camera.inferring = True
+                camera.next_due = self._clock() + 1.0 / max(0.1, camera.target_fps or camera.max_fps)
+                task = asyncio.create_task(self._job(camera))
+                self._jobs.add(task)
+                task.add_done_callback(self._jobs.discard)
+                self._camera_jobs[camera.id] = task
 
-    def _sleep_until_due(self, now: float) -> float:
-        cameras = self._registry.schedulable()
-        if not cameras:
-            return IDLE_POLL_S
-        waits = [c.next_due - now for c in cameras if not c.inferring]
-        return min(max(min(waits, default=0.0), DISPATCH_POLL_S), 0.25)
+                def forget(done: asyncio.Task[None], camera_id: str = camera.id) -> None:
+                    if self._camera_jobs.get(camera_id) is done:
+                        self._camera_jobs.pop(camera_id)
+
+                task.add_done_callback(forget)
+                continue
+            if not saturated and self._admit_on_demand():
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), None if saturated else self._sleep_until_due(now))
+            except TimeoutError:
+                pass
+
+    def _sync(self, now: float) -> None:
+        """Rebuilds the dispatch heap from the schedulable cameras and re-tunes the platform.
+
+        Allocation is only redone when the set of schedulable cameras changed.
+        """
+        self._stale = False
+        self._synced_at = now
+        cameras = {camera.id: camera for camera in self._registry.schedulable()}
+        if cameras.keys() != self._cameras.keys() or any(self._cameras[i] is not c for i, c in cameras.items()):
+            self._reallocate = True
+        self._cameras = cameras
+        self._watching = any(camera.in_use for camera in self._registry.values())
+        self._queue = [(c.next_due, next(self._order), c) for c in self._cameras.values() if not c.inferring]
+        heapq.heapify(self._queue)
+        self.tune()
+
+    def _enqueue(self, camera: Camera) -> None:
+        if self._cameras.get(camera.id) is camera:
+            heapq.heappush(self._queue, (camera.next_due, next(self._order), camera))
+
+    def _pop_due(self, now: float) -> Camera | None:
+        """Takes the most overdue camera due within the batch window, dropping outdated heap entries.
+
+        An entry is outdated once its camera was rescheduled, dispatched or
+        stopped being schedulable; the camera's current entry, if any, is
+        further down the heap or is added again by the next sync.
+        """
+        while self._queue:
+            due, _, camera = self._queue[0]
+            if (
+                due != camera.next_due
+                or camera.inferring
+                or self._cameras.get(camera.id) is not camera
+                or not (camera.in_use and camera.online)
+            ):
+                heapq.heappop(self._queue)
+                continue
+            if now + self.batch_window_s < due:
+                return None
+            heapq.heappop(self._queue)
+            return camera
+        return None
+
+    def _sleep_until_due(self, now: float) -> float | None:
+        """Seconds until the loop must look again, or None to wait for a wake-up.
+
+        With no camera in use nothing can fall due, so the loop parks until the
+        registry, a freed worker or an on-demand frame wakes it.
+        """
+        if not self._watching and not self._queue:
+            return None
+        deadline = self._synced_at + SYNC_S
+        if self._queue:
+            deadline = min(deadline, self._queue[0][0] - self.batch_window_s)
+        return max(0.0, deadline - now)
 
     async def _job(self, camera: Camera) -> None:
         try:
-            frame = await camera.frame_source.grab() if camera.frame_source else None
+            grab_started = self._clock()
+            frame = await camera.frame_source.grab(luma=True) if camera.frame_source else None
             if frame is None or frame.seq == camera.last_seq:
-                camera.next_due = time.monotonic() + STALE_RETRY_S
+                camera.next_due = self._clock() + STALE_RETRY_S
                 return
             camera.last_seq = frame.seq
-            rgb = vision.transform(
-                frame.rgb,
-                rotation=camera.rotation,
-                crop=camera.crop,
-                brightness=camera.brightness,
-                contrast=camera.contrast,
-                sharpness=camera.sharpness,
-            )
-            started = time.monotonic()
-            result = await self._platform.infer(rgb)
-            elapsed_ms = (time.monotonic() - started) * 1000.0
+            plan = camera.preprocess_plan(frame.pixels.shape, frame.limited)
+            watching = self.reuse_distance > 0 or self.quiet_period_s > 0
+            signature = vision.signature(frame.pixels, plan) if watching else None
+            self._track_motion(camera, signature)
+            grab_ms = (self._clock() - grab_started) * 1000.0
+            reused = self._reusable(camera, signature)
+            camera.reuse_rate = (1 - REUSE_SMOOTHING) * camera.reuse_rate + REUSE_SMOOTHING * reused
+            if reused:
+                camera.mark_inferred(camera.last_result, self._clock())
+                return
+            await self._take_slot()
+            try:
+                started = self._clock()
+                result = await self._platform.infer(frame.pixels, plan)
+                elapsed_ms = (self._clock() - started) * 1000.0
+            finally:
+                self._in_model -= 1
+                self._release()
             self.infer_ms = (
                 elapsed_ms
                 if not self.infer_ms
                 else (1 - LATENCY_SMOOTHING) * self.infer_ms + LATENCY_SMOOTHING * elapsed_ms
             )
-            camera.mark_inferred(result)
-            await self._on_result(camera, Frame(rgb=rgb, seq=frame.seq, ts=frame.ts), result)
+            service_ms = elapsed_ms + grab_ms
+            camera.service_ms = (
+                service_ms
+                if not camera.service_ms
+                else (1 - LATENCY_SMOOTHING) * camera.service_ms + LATENCY_SMOOTHING * service_ms
+            )
+            camera.signature, camera.signature_at = signature, self._clock()
+            camera.mark_inferred(result, self._clock())
+            await self._on_result(camera, replace(frame, plan=plan), result)
         except Exception as exc:
-            camera.next_due = time.monotonic() + STALE_RETRY_S
+            camera.next_due = self._clock() + STALE_RETRY_S
             logger.debug("inference failed on '%s'", camera.name, exc_info=True)
-            if time.monotonic() - self._last_error_at > ERROR_THROTTLE_S:
-                self._last_error_at = time.monotonic()
+            if self._clock() - self._last_error_at > ERROR_THROTTLE_S:
+                self._last_error_at = self._clock()
                 self._on_error(f"inference failed on '{camera.name}': {exc}")
         finally:
             camera.inferring = False
-            self._slots.release()
+            self._in_flight -= 1
+            self._reallocate = self._reallocate or self._drifted(camera, self._clock())
+            self._enqueue(camera)
+            self._wake.set()
+
+    def _track_motion(self, camera: Camera, signature: np.ndarray | None) -> None:
+        """Updates whether a camera's view is quiet, reallocating when that flips.
+
+        A frame whose signature differs from the one at the last change by more
+        than QUIET_DISTANCE grey levels in any cell is a change, so slow drift
+        adds up. The view is quiet once `quiet_period_s` passes without one, and
+        never while the camera carries any risk.
+        """
+        now = self._clock()
+        if signature is None:
+            camera.motion_signature = None
+        elif camera.motion_signature is None or vision.signature_distance(signature, camera.motion_signature) > QUIET_DISTANCE:
+            camera.motion_signature, camera.still_since = signature, now
+        quiet = (
+            self.quiet_period_s > 0
+            and camera.motion_signature is not None
+            and camera.risk == 0
+            and now - camera.still_since >= self.quiet_period_s
+        )
+        if quiet != camera.quiet:
+            camera.quiet = quiet
+            self._reallocate = True
+
+    def _reusable(self, camera: Camera, signature: np.ndarray | None) -> bool:
+        """Whether a frame is close enough to the last one inferred to reuse its result.
+
+        Frames are compared with the last one the model ran on, not the last one
+        seen, so slow change accumulates until it forces a fresh inference, and
+        no result is reused for longer than REUSE_MAX_AGE_S. A camera carrying
+        any risk, from a score near a threshold or an open defect streak, never
+        reuses: a suspicion is confirmed or cleared on fresh frames only.
+        """
+        return (
+            self.reuse_distance > 0
+            and camera.risk == 0
+            and signature is not None
+            and camera.signature is not None
+            and camera.last_result is not None
+            and self._clock() - camera.signature_at < REUSE_MAX_AGE_S
+            and vision.signature_distance(signature, camera.signature) <= self.reuse_distance
+        )
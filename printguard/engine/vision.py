@@ -15,6 +15,10 @@ import numpy as np
 INPUT_SIZE = 224
 RESIZE_SHORTEST = 256
 GREYSCALE_WEIGHTS = np.asarray([0.2989, 0.5870, 0.1140], dtype=np.float32)
+VIDEO_BLACK = 16.0
+VIDEO_WHITE = 235.0
+LIMITED_LEVELS = np.clip(np.rint((np.arange(256) - VIDEO_BLACK) * 255.0 / (VIDEO_WHITE - VIDEO_BLACK)), 0, 255).astype(np.uint8)
+SIGNATURE_STRIDE = 4
 MARGIN_HALF_SPAN = 4.0
 
 
@@ -45,37 +49,241 @@ def assets_from_dicts(meta: dict[str, Any], protos: dict[str, list[float]]) -> A
     )
 
 
-def _resize(arr: np.ndarray, nw: int, nh: int) -> np.ndarray:
-    h, w = arr.shape[:2]
-    y_idx = np.linspace(0, h - 1, nh).astype(np.int64)
-    x_idx = np.linspace(0, w - 1, nw).astype(np.int64)
-    return arr[y_idx[:, None], x_idx[None, :]]
+@dataclass(frozen=True)
+class Plan:
+    """A camera's image pipeline compiled against one frame size.
+
+    Rotation, cropping, the resize to 256 and the centre crop to 224 all pick
+    source pixels rather than blend them, so together they reduce to a table
+    naming the source pixel behind each model input pixel. Brightness and
+    contrast act on each pixel alone, and sharpening reads only the eight
+    neighbours of a pixel, which the table carries as extra layers. A frame then
+    costs one uint8 gather of 224x224 pixels however large the source is.
+
+    A plan applies equally to an RGB frame and to a luminance plane of the same
+    size, which a video decoder hands over without any colour conversion.
+
+    Attributes:
+        shape: Source frame height and width the plan was compiled for.
+        rotation: Clockwise rotation in degrees (0, 90, 180, 270).
+        crop: Normalised crop region on the rotated frame, or None.
+        brightness: Linear brightness multiplier.
+        contrast: Contrast scale around mid-grey.
+        sharpness: Unsharp-mask strength.
+        index: Flat source pixel indices, shape (1, 224, 224), or (9, 224, 224)
+            with the 3x3 neighbourhood in row order when sharpening.
+        limited: Whether luminance frames use video levels, 16 to 235, rather
+            than the full 0 to 255; RGB frames are always full range.
+    """
 
+    shape: tuple[int, int]
+    rotation: int
+    crop: dict[str, float] | None
+    brightness: float
+    contrast: float
+    sharpness: float
+    index: np.ndarray
+    limited: bool = False
+
+    @property
+    def adjusts(self) -> bool:
+        """Whether the plan changes pixel values as well as picking them."""
+        return self.brightness != 1.0 or self.contrast != 1.0 or self.sharpness > 0.0
+
+    def render(self, rgb: np.ndarray) -> np.ndarray:
+        """Applies the full pipeline at source resolution, as the live view shows the frame."""
+        return transform(
+            rgb,
+            rotation=self.rotation,
+            crop=self.crop,
+            brightness=self.brightness,
+            contrast=self.contrast,
+            sharpness=self.sharpness,
+        )
+
+
+def _sample_indices(h: int, w: int) -> tuple[np.ndarray, np.ndarray]:
+    """Rows and columns kept by resizing the shortest edge to 256 and centre-cropping to 224."""
+    scale = RESIZE_SHORTEST / min(w, h)
+    nh, nw = max(INPUT_SIZE, round(h * scale)), max(INPUT_SIZE, round(w * scale))
+    top, left = (nh - INPUT_SIZE) // 2, (nw - INPUT_SIZE) // 2
+    rows = np.linspace(0, h - 1, nh).astype(np.int64)[top : top + INPUT_SIZE]
+    cols = np.linspace(0, w - 1, nw).astype(np.int64)[left : left + INPUT_SIZE]
+    return rows, cols
 
-def preprocess(rgb: np.ndarray, assets: Assets) -> np.ndarray:
-    """Converts an RGB frame into the model's normalised NCHW input tensor.
 
-    Resizes the shortest edge to 256, centre-crops to 224, collapses to
-    luminance and replicates across three normalised channels.
+def compile_plan(
+    shape: tuple[int, ...],
+    *,
+    rotation: int = 0,
+    crop: dict[str, float] | None = None,
+    brightness: float = 1.0,
+    contrast: float = 1.0,
+    sharpness: float = 0.0,
+    limited: bool = False,
+) -> Plan:
+    """Compiles a camera's image pipeline for frames of one size.
 
     Args:
-        rgb: HxWx3 uint8 or float frame in RGB channel order.
+        shape: Source frame shape; only height and width are used.
+        rotation: Clockwise rotation in degrees (0, 90, 180, 270).
+        crop: Normalised crop region on the rotated frame, or None.
+        brightness: Linear brightness multiplier.
+        contrast: Contrast scale around mid-grey.
+        sharpness: Unsharp-mask strength.
+        limited: Whether luminance frames use video levels.
+
+    Returns:
+        A Plan that sample() applies in place of transform().
+    """
+    h, w = shape[:2]
+    rotated_h, rotated_w = (w, h) if rotation in (90, 270) else (h, w)
+    x0, y0, x1, y1 = _crop_bounds(rotated_h, rotated_w, crop)
+    rows, cols = _sample_indices(y1 - y0, x1 - x0)
+    offsets = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1)] if sharpness > 0.0 else [(0, 0)]
+    layers = []
+    for dy, dx in offsets:
+        r = y0 + np.clip(rows + dy, 0, y1 - y0 - 1)[:, None]
+        c = x0 + np.clip(cols + dx, 0, x1 - x0 - 1)[None, :]
+        if rotation == 90:
+            r, c = h - 1 - c, r
+        elif rotation == 180:
+            r, c = h - 1 - r, w - 1 - c
+        elif rotation == 270:
+            r, c = c, w - 1 - r
+        layers.append(np.broadcast_to(r * w + c, (INPUT_SIZE, INPUT_SIZE)))
+    return Plan(
+        shape=(h, w),
+        rotation=rotation,
+        crop=crop,
+        brightness=brightness,
+        contrast=contrast,
+        sharpness=sharpness,
+        index=np.stack(layers).astype(np.intp),
+        limited=limited,
+    )
+
+
+def _adjust_sampled(pixels: np.ndarray, plan: Plan) -> np.ndarray:
+    """Applies adjust() to gathered pixels, reading sharpening neighbours from the extra layers."""
+    arr = pixels.astype(np.float32)
+    if plan.brightness != 1.0:
+        arr *= plan.brightness
+    if plan.contrast != 1.0:
+        arr = (arr - 128.0) * plan.contrast + 128.0
+    centre = arr[len(arr) // 2]
+    if plan.sharpness > 0.0:
+        blur = arr[0].copy()
+        for neighbour in arr[1:]:
+            blur += neighbour
+        centre = centre + plan.sharpness * (centre - blur / 9.0)
+    return np.clip(centre, 0, 255).astype(np.uint8)
+
+
+def sample(pixels: np.ndarray, plan: Plan | None = None, out: np.ndarray | None = None) -> np.ndarray:
+    """Reads the model's view of a frame as full-range luminance, before normalisation.
+
+    Resizes the shortest edge to 256, centre-crops to 224 and collapses to
+    luminance. Given a plan, the camera's pipeline is applied on the way, so the
+    frame need not be transformed first. A luminance frame skips the collapse,
+    and is first stretched to full range when the plan says it carries video
+    levels. This is the input an encoder that takes pixels reads directly.
+
+    Args:
+        pixels: HxWx3 uint8 frame in RGB channel order, or an HxW uint8
+            luminance plane.
+        plan: Compiled pipeline for this frame's size, or None for the frame as is.
+        out: Uint8 array of shape (224, 224) to write into, or None to allocate.
+
+    Returns:
+        Uint8 array of shape (224, 224).
+    """
+    if not (pixels.ndim == 2 or (pixels.ndim == 3 and pixels.shape[2] == 3)):
+        raise ValueError(f"expected HxWx3 RGB frame or HxW luminance plane, got {pixels.shape}")
+    if plan is None:
+        plan = compile_plan(pixels.shape)
+    elif plan.shape != pixels.shape[:2]:
+        raise ValueError(f"plan compiled for {plan.shape} frames, got {pixels.shape[:2]}")
+    if out is None:
+        out = np.empty((INPUT_SIZE, INPUT_SIZE), dtype=np.uint8)
+    if pixels.ndim == 2 and not plan.limited and not plan.adjusts:
+        return np.take(pixels, plan.index[0], out=out)
+    if pixels.ndim == 2:
+        gathered = np.take(pixels, plan.index)
+        if plan.limited:
+            gathered = np.take(LIMITED_LEVELS, gathered)
+        np.copyto(out, _adjust_sampled(gathered, plan) if plan.adjusts else gathered[0])
+        return out
+    gathered = np.take(pixels.reshape(-1, 3), plan.index, axis=0)
+    sampled = _adjust_sampled(gathered, plan) if plan.adjusts else gathered[0]
+    np.rint(sampled.astype(np.float32) @ GREYSCALE_WEIGHTS, out=out, casting="unsafe")
+    return out
+
+
+def normalise(samples: np.ndarray, assets: Assets, out: np.ndarray | None = None) -> np.ndarray:
+    """Turns a batch of luminance samples into the model's normalised NCHW input tensor.
+
+    Args:
+        samples: Uint8 array of shape (N, 224, 224) from sample().
+        assets: Normalisation constants to apply.
+        out: Float32 array of shape (N, 3, 224, 224) to write into, or None to allocate.
+
+    Returns:
+        Float32 tensor of shape (N, 3, 224, 224), one normalised copy of the
+        luminance per channel.
+    """
+    if out is None:
+        out = np.empty((len(samples), len(assets.mean), INPUT_SIZE, INPUT_SIZE), dtype=np.float32)
+    for channel, (mean, std) in enumerate(zip(assets.mean, assets.std)):
+        np.multiply(samples, np.float32(1.0 / (255.0 * std)), out=out[:, channel])
+        out[:, channel] -= np.float32(mean / std)
+    return out
+
+
+def preprocess(rgb: np.ndarray, assets: Assets, plan: Plan | None = None) -> np.ndarray:
+    """Converts an RGB or luminance frame into the model's normalised NCHW input tensor.
+
+    The hub hands raw frames to its runtimes, which sample them in a worker and
+    normalise into the model's own input buffer; this is the single-frame path
+    local mode uses.
+
+    Args:
+        rgb: HxWx3 uint8 frame in RGB channel order, or an HxW uint8 luminance plane.
         assets: Normalisation constants to apply.
+        plan: Compiled pipeline for this frame's size, or None for the frame as is.
 
     Returns:
         Float32 tensor of shape (1, 3, 224, 224).
     """
-    if rgb.ndim != 3 or rgb.shape[2] != 3:
-        raise ValueError(f"expected HxWx3 RGB frame, got {rgb.shape}")
-    arr = rgb.astype(np.float32) / 255.0
-    h, w = arr.shape[:2]
-    scale = RESIZE_SHORTEST / min(w, h)
-    arr = _resize(arr, max(INPUT_SIZE, round(w * scale)), max(INPUT_SIZE, round(h * scale)))
-    h, w = arr.shape[:2]
-    top, left = (h - INPUT_SIZE) // 2, (w - INPUT_SIZE) // 2
-    grey = arr[top : top + INPUT_SIZE, left : left + INPUT_SIZE] @ GREYSCALE_WEIGHTS
-    chans = np.stack([(grey - m) / s for m, s in zip(assets.mean, assets.std)], axis=0)
-    return chans[np.newaxis, ...].astype(np.float32)
+    return normalise(sample(rgb, plan)[np.newaxis], assets)
+
+
+def signature(pixels: np.ndarray, plan: Plan) -> np.ndarray:
+    """Summarises what the model would see as a coarse luminance grid, for spotting repeated frames.
+
+    Every fourth model input pixel is read through the plan and averaged in
+    4x4 blocks, so sensor noise largely cancels while a change anywhere in the
+    view still moves the cell it falls in.
+
+    Args:
+        pixels: The RGB frame or luminance plane the plan was compiled for.
+        plan: The camera's compiled pipeline.
+
+    Returns:
+        Float32 array of shape (14, 14) in grey levels.
+    """
+    index = plan.index[len(plan.index) // 2, ::SIGNATURE_STRIDE, ::SIGNATURE_STRIDE]
+    if pixels.ndim == 2:
+        grey = np.take(pixels, index).astype(np.float32)
+    else:
+        grey = np.take(pixels.reshape(-1, 3), index, axis=0).astype(np.float32) @ GREYSCALE_WEIGHTS
+    cells = INPUT_SIZE // SIGNATURE_STRIDE // SIGNATURE_STRIDE
+    return grey.reshape(cells, SIGNATURE_STRIDE, cells, SIGNATURE_STRIDE).mean(axis=(1, 3))
+
+
+def signature_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """Largest change in any cell between two signatures, in grey levels."""
+    return float(np.abs(a - b).max())
 
 
 def classify(embedding: np.ndarray, assets: Assets) -> dict[str, Any]:
@@ -124,7 +332,13 @@ def crop_frame(rgb: np.ndarray, crop: dict[str, float] | None) -> np.ndarray:
     """
     if crop is None:
         return rgb
-    h, w = rgb.shape[:2]
+    x0, y0, x1, y1 = _crop_bounds(*rgb.shape[:2], crop)
+    return rgb[y0:y1, x0:x1]
+
+
+def _crop_bounds(h: int, w: int, crop: dict[str, float] | None) -> tuple[int, int, int, int]:
+    if crop is None:
+        return 0, 0, w, h
     x0 = int(crop["x"] * w)
     y0 = int(crop["y"] * h)
     x1 = int((crop["x"] + crop["w"]) * w)
@@ -133,7 +347,7 @@ def crop_frame(rgb: np.ndarray, crop: dict[str, float] | None) -> np.ndarray:
     y0 = max(0, min(h - 1, y0))
     x1 = max(x0 + 1, min(w, x1))
     y1 = max(y0 + 1, min(h, y1))
-    return rgb[y0:y1, x0:x1]
+    return x0, y0, x1, y1
 
 
 def adjust(rgb: np.ndarray, brightness: float = 1.0, contrast: float = 1.0, sharpness: float = 0.0) -> np.ndarray:
@@ -15,7 +15,7 @@ import time
 from typing import TYPE_CHECKING, Any, Coroutine
 
 from .integrations import INTEGRATIONS, DeviceAction
-from .monitors import monitor_watching
+from .monitors import monitor_watching, required_fps
 from .notifiers import NOTIFIERS
 from .platform import Frame
 
@@ -25,12 +25,15 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 DEVICE_POLL_S = 5.0
+DEVICE_IDLE_POLL_S = 60.0
 NOTIFY_COOLDOWN_S = 30.0
 WATCH_TICK_S = 2.0
 OFFLINE_GRACE_S = 12.0
 STALL_GRACE_S = 30.0
 ACT_ATTEMPTS = 3
 ACT_RETRY_S = 1.0
+RISK_BAND = 0.15
+RATE_TOLERANCE = 0.95
 
 
 class Watchdog:
@@ -58,13 +61,36 @@ class Watchdog:
             task.cancel()
         await asyncio.gather(*tasks, return_exceptions=True)
 
+    def _polling(self) -> bool:
+        """Whether printer states are needed every DEVICE_POLL_S.
+
+        That is while a printer has never been polled, a transport is listening,
+        or an enabled monitor is linked to a printer and must learn when it
+        starts printing.
+        """
+        printers = self._engine.printers
+        if not printers.items:
+            return False
+        return (
+            any(p.device_state is None for p in printers.values())
+            or self._engine.subscribed
+            or any(m.get("enabled") and m.get("printer_id") in printers.items for m in self._engine.monitors.values())
+        )
+
+    def _watching(self) -> bool:
+        return any(monitor_watching(m, self._engine.printers) for m in self._engine.monitors.values())
+
     async def poll_devices(self) -> None:
         """Periodically refreshes registered printer states.
 
         A state change re-syncs which cameras are scheduled, so inference
         stops while a printer is idle or paused and resumes when it prints.
+        With no printers registered the loop parks until one is; with nothing
+        linked to them and no transport listening it polls every
+        DEVICE_IDLE_POLL_S, so the API's printer states stay roughly current.
         """
         while True:
+            await self._engine.park(self._polling, DEVICE_IDLE_POLL_S if self._engine.printers.items else None)
             changed = False
             for printer in self._engine.printers.values():
                 adapter = INTEGRATIONS.get(printer.provider)
@@ -93,10 +119,13 @@ class Watchdog:
         sources do not flap; each sustained outage warns exactly once and
         announces its recovery. A camera that stays online but stops
         producing fresh frames counts as stalled - frozen feeds must not
-        pass for monitoring.
+        pass for monitoring. A monitor whose camera is allocated too low a rate
+        to act within its detection deadline counts as underserved. With no
+        monitor watching, the loop parks until one is.
         """
         while True:
-            now = time.monotonic()
+            await self._engine.park(self._watching)
+            now = self._engine.clock()
             for monitor in list(self._engine.monitors.values()):
                 mid = monitor["id"]
                 camera = self._engine.cameras.get(monitor["camera_id"]) if monitor["camera_id"] else None
@@ -135,6 +164,17 @@ class Watchdog:
                 )
                 if stalled:
                     await self._engine.restart_camera(camera)
+                needed = required_fps(monitor)
+                await self._edge(
+                    f"rate:{mid}",
+                    not camera.online or camera.quiet or camera.target_fps >= RATE_TOLERANCE * needed,
+                    now,
+                    OFFLINE_GRACE_S,
+                    monitor,
+                    f"'{monitor['name']}' is checked at {camera.target_fps:.2g} fps but needs {needed:.2g} fps "
+                    f"to act within {monitor['detect_within_s']:g} s of a failure on camera '{camera.name}'",
+                    f"'{monitor['name']}' is checked fast enough for its detection deadline again",
+                )
                 printer = self._engine.printers.get(monitor["printer_id"]) if monitor.get("printer_id") else None
                 if printer is not None:
                     reachable = (printer.device_state or {}).get("status") != "offline"
@@ -192,18 +232,32 @@ class Watchdog:
                 monitor["alert"] = None
             return
         self._streaks[mid] = self._streaks.get(mid, 0) + 1
-        if self._streaks[mid] < monitor["consecutive"] or time.monotonic() < self._cooldown_until.get(mid, 0.0):
+        if self._streaks[mid] < monitor["consecutive"] or self._engine.clock() < self._cooldown_until.get(mid, 0.0):
             return
-        self._cooldown_until[mid] = time.monotonic() + monitor["cooldown_s"]
+        self._cooldown_until[mid] = self._engine.clock() + monitor["cooldown_s"]
         self._schedule(self._respond(monitor, frame, score))
 
+    def risk(self, monitor: dict[str, Any], score: float) -> float:
+        """How urgently a monitor needs fresh frames after a score, in [0, 1].
+
+        Half comes from how close the score is to the threshold, rising from
+        nothing RISK_BAND below it. The other half comes from a streak that has
+        started but not yet reached `consecutive`, growing with its length, so
+        frames arrive fastest while a suspected failure can still be confirmed
+        or cleared.
+        """
+        proximity = min(1.0, max(0.0, 1.0 - (monitor["threshold"] - score) / RISK_BAND))
+        streak = self._streaks.get(monitor["id"], 0)
+        pending = streak / monitor["consecutive"] if streak < monitor["consecutive"] else 0.0
+        return 0.5 * proximity + 0.5 * pending
+
     async def _respond(self, monitor: dict[str, Any], frame: Frame, score: float) -> None:
         action = await self._act(monitor)
         alert = {"score": round(score, 3), "action": action, "ts": time.time()}
         if self._streaks.get(monitor["id"], 0):
             monitor["alert"] = alert
         self._engine.emit({"event": "alert", "monitor_id": monitor["id"], **alert})
-        image = await self._engine.platform.encode_jpeg(frame.rgb)
+        image = await self._engine.platform.encode_jpeg(frame)
         self._engine.note_alert(monitor["id"], alert, image)
         await self._notify(monitor, score, action, image)
 
@@ -229,9 +283,9 @@ class Watchdog:
     async def _notify(self, monitor: dict[str, Any], score: float, action: str, image: bytes | None) -> None:
         if not monitor.get("notify"):
             return
-        if time.monotonic() - self._last_notified.get(monitor["id"], 0.0) < NOTIFY_COOLDOWN_S:
+        if self._engine.clock() - self._last_notified.get(monitor["id"], 0.0) < NOTIFY_COOLDOWN_S:
             return
-        self._last_notified[monitor["id"]] = time.monotonic()
+        self._last_notified[monitor["id"]] = self._engine.clock()
         title = f"PrintGuard: {monitor['name']} defect ({score * 100:.0f}%)"
         if action == "failed":
             body = f"AUTOMATIC {monitor['on_defect'].upper()} FAILED — check the printer"
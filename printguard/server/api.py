@@ -20,6 +20,7 @@ from pydantic import BaseModel, ConfigDict
 from ..engine.engine import Engine
 from ..engine.integrations import INTEGRATIONS
 from ..engine.notifiers import NOTIFIERS
+from ..engine.scheduler import InferenceBusy
 from ..engine.tokens import SCOPE_ORDER, expand_scope, hash_secret
 
 logger = logging.getLogger(__name__)
@@ -98,6 +99,7 @@ class MonitorFields(BaseModel):
     notify: bool | None = None
     on_defect: Literal["none", "pause", "cancel"] | None = None
     cooldown_s: int | None = None
+    detect_within_s: float | None = None
 
 
 class CameraSource(BaseModel):
@@ -129,7 +131,17 @@ class ProviderTest(BaseModel):
 class SettingsPatch(BaseModel):
     notifiers: dict[str, dict[str, Any]] | None = None
     mqtt: dict[str, Any] | None = None
-    inference_runtime: Literal["auto", "litert", "onnx"] | None = None
+    inference_runtime: Literal["auto", "litert", "onnx", "process"] | None = None
+    inference_mode: Literal["auto", "latency", "throughput"] | None = None
+    batch_window_ms: float | None = None
+    frame_reuse_distance: float | None = None
+    quiet_period_s: float | None = None
+    on_demand_share: float | None = None
+    power_profile: Literal["full", "shared", "raspberry_pi", "battery", "custom"] | None = None
+    inference_budget: float | None = None
+    max_camera_fps: float | None = None
+    state_interval_s: float | None = None
+    history_bucket_s: Literal[60, 300, 900] | None = None
 
 
 class ActionBody(BaseModel):
@@ -193,6 +205,7 @@ class MonitorOut(_ReadModel):
     notify: bool | None = None
     on_defect: Literal["none", "pause", "cancel"] | None = None
     cooldown_s: int | None = None
+    detect_within_s: float | None = None
     watching: bool | None = None
     result: MonitorResult | None = None
     alert: MonitorAlert | None = None
@@ -273,6 +286,11 @@ def build_api_app(auth: ApiAuth) -> FastAPI:
         """Maps a rejected engine command to a 400 instead of a bare 500."""
         return JSONResponse(status_code=400, content={"detail": str(exc)})
 
+    @api.exception_handler(InferenceBusy)
+    async def inference_busy(request: Request, exc: InferenceBusy) -> JSONResponse:
+        """Maps an on-demand frame turned away for live monitoring to a 503 the caller can retry."""
+        return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
     @api.exception_handler(TimeoutError)
     async def command_timeout(request: Request, exc: TimeoutError) -> JSONResponse:
         """Maps an engine command that outran its deadline to a 504."""
@@ -451,6 +469,12 @@ def build_api_app(auth: ApiAuth) -> FastAPI:
         await engine.request({"cmd": "settings.update", "patch": body.model_dump(exclude_none=True)})
         return public_state(engine)["settings"]
 
+    @api.post("/model/reload", operation_id="reload_model", tags=["manage"])
+    async def reload_model(engine: Engine = Depends(get_engine)) -> dict[str, Any]:
+        """Reloads the model files without a restart, monitoring throughout, and returns the new stats."""
+        await engine.request({"cmd": "model.reload"})
+        return public_state(engine)["stats"]
+
     @api.post("/notifiers/test", operation_id="test_notifier", tags=["manage"])
     async def test_notifier(body: ProviderTest, engine: Engine = Depends(get_engine)) -> dict[str, Any]:
         """Sends a test notification through a configured notifier."""
@@ -0,0 +1,286 @@
+"""Folds an encoder's three identical input channels into one.
+
+PrintGuard feeds the model one luminance plane replicated across three
+channels, each normalised with its own mean and standard deviation, so the
+first convolution does three times the work it needs on identical data. This
+tool rewrites that convolution to read a single channel of plain grey levels:
+the per-channel scale is folded into its weights, and the per-channel mean into
+a constant added to its output. The constant is a map rather than a bias
+because zero padding at the borders drops some of the mean's terms; the map
+keeps every output exact.
+
+For each `encoder_<precision>.onnx` and `.tflite` in the model directory it
+writes `encoder_<precision>_mono` beside it, checked against the original on
+random frames, and the hub loads that in its place. Folding ONNX encoders needs
+the `onnx` package, which the hub itself does not::
+
+    uv run --with onnx python -m printguard.server.fold_channels models
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import os
+from pathlib import Path
+
+import flatbuffers
+import numpy as np
+from ai_edge_litert import schema_py_generated as schema
+
+from ..engine import logs, vision
+from .inference import MONO_SUFFIX, LiteRtInference, OnnxInference, _load_assets
+
+logger = logging.getLogger(__name__)
+
+VERIFY_FRAMES = 4
+VERIFY_TOLERANCE = 1e-4
+
+
+def _fold_weights(weights: np.ndarray, assets: vision.Assets) -> np.ndarray:
+    """Collapses (O, C, KH, KW) weights to (O, 1, KH, KW) over grey levels 0 to 255."""
+    scale = np.asarray([1.0 / (255.0 * std) for std in assets.std])
+    return np.einsum("ockl,c->okl", weights.astype(np.float64), scale)[:, np.newaxis].astype(weights.dtype)
+
+
+def _tap_mask(size: int, out: int, kernel: int, stride: int, dilation: int, pad: int) -> np.ndarray:
+    """(kernel, out) mask of the taps that land inside the input rather than in padding."""
+    positions = np.arange(out)[np.newaxis] * stride - pad + np.arange(kernel)[:, np.newaxis] * dilation
+    return ((positions >= 0) & (positions < size)).astype(np.float64)
+
+
+def _mean_map(
+    weights: np.ndarray,
+    assets: vision.Assets,
+    out: tuple[int, int],
+    strides: tuple[int, int],
+    dilations: tuple[int, int],
+    pads: tuple[int, int],
+) -> np.ndarray:
+    """The (O, H', W') contribution of the normalisation mean to each output of the convolution.
+
+    Each in-bounds tap adds its weights times -mean/std for every channel; taps
+    in the padding add nothing.
+    """
+    offset = np.asarray([-mean / std for mean, std in zip(assets.mean, assets.std)])
+    per_tap = np.einsum("ockl,c->okl", weights.astype(np.float64), offset)
+    rows = _tap_mask(vision.INPUT_SIZE, out[0], weights.shape[2], strides[0], dilations[0], pads[0])
+    cols = _tap_mask(vision.INPUT_SIZE, out[1], weights.shape[3], strides[1], dilations[1], pads[1])
+    return np.einsum("okl,ki,lj->oij", per_tap, rows, cols).astype(weights.dtype)
+
+
+def _same_padding(kernel: int, stride: int, dilation: int, lower: bool = False) -> tuple[int, int]:
+    """Output size and leading pad of a SAME convolution over the model input."""
+    out = math.ceil(vision.INPUT_SIZE / stride)
+    total = max((out - 1) * stride + (kernel - 1) * dilation + 1 - vision.INPUT_SIZE, 0)
+    return out, (total + 1) // 2 if lower else total // 2
+
+
+def _valid_size(kernel: int, stride: int, dilation: int, pad_total: int = 0) -> int:
+    return (vision.INPUT_SIZE + pad_total - (kernel - 1) * dilation - 1) // stride + 1
+
+
+def fold_onnx(source: Path, target: Path, assets: vision.Assets) -> None:
+    """Writes a single-channel copy of an ONNX encoder whose NCHW input feeds a convolution.
+
+    Raises:
+        ValueError: If the graph does not start with a plain convolution.
+    """
+    import onnx
+    from onnx import helper, numpy_helper
+
+    model = onnx.load(str(source))
+    graph = model.graph
+    model_input = graph.input[0]
+    dims = model_input.type.tensor_type.shape.dim
+    if len(dims) != 4 or dims[1].dim_value != 3:
+        raise ValueError("input is not a three-channel NCHW tensor")
+    consumers = [node for node in graph.node if model_input.name in node.input]
+    if len(consumers) != 1 or consumers[0].op_type != "Conv":
+        raise ValueError("input does not feed a single convolution")
+    conv = consumers[0]
+    attributes = {attribute.name: helper.get_attribute_value(attribute) for attribute in conv.attribute}
+    if attributes.get("group", 1) != 1:
+        raise ValueError("first convolution is grouped")
+    initializers = {initializer.name: initializer for initializer in graph.initializer}
+    if conv.input[1] not in initializers:
+        raise ValueError("first convolution weights are not constant")
+    weights = numpy_helper.to_array(initializers[conv.input[1]])
+    kernel = weights.shape[2:]
+    strides = tuple(attributes.get("strides", (1, 1)))
+    dilations = tuple(attributes.get("dilations", (1, 1)))
+    auto_pad = attributes.get("auto_pad", b"NOTSET")
+    auto_pad = auto_pad.decode() if isinstance(auto_pad, bytes) else auto_pad
+    if auto_pad in ("SAME_UPPER", "SAME_LOWER"):
+        (out_h, pad_h), (out_w, pad_w) = (
+            _same_padding(kernel[axis], strides[axis], dilations[axis], lower=auto_pad == "SAME_LOWER")
+            for axis in (0, 1)
+        )
+    else:
+        pads = tuple(attributes.get("pads", (0, 0, 0, 0))) if auto_pad == "NOTSET" else (0, 0, 0, 0)
+        pad_h, pad_w = pads[0], pads[1]
+        out_h = _valid_size(kernel[0], strides[0], dilations[0], pads[0] + pads[2])
+        out_w = _valid_size(kernel[1], strides[1], dilations[1], pads[1] + pads[3])
+    mean_map = _mean_map(weights, assets, (out_h, out_w), strides, dilations, (pad_h, pad_w))
+
+    folded = f"{conv.input[1]}{MONO_SUFFIX}"
+    graph.initializer.remove(initializers[conv.input[1]])
+    graph.initializer.extend(
+        [
+            numpy_helper.from_array(_fold_weights(weights, assets), folded),
+            numpy_helper.from_array(mean_map[np.newaxis], f"{conv.output[0]}{MONO_SUFFIX}_mean"),
+        ]
+    )
+    conv.input[1] = folded
+    output = conv.output[0]
+    conv.output[0] = f"{output}{MONO_SUFFIX}_raw"
+    graph.node.insert(
+        list(graph.node).index(conv) + 1,
+        helper.make_node("Add", [conv.output[0], f"{output}{MONO_SUFFIX}_mean"], [output]),
+    )
+    dims[1].dim_value = 1
+    onnx.checker.check_model(model)
+    onnx.save(model, str(target))
+
+
+def _builtin(model: schema.ModelT, operator: schema.OperatorT) -> int:
+    code = model.operatorCodes[operator.opcodeIndex]
+    return max(code.builtinCode, code.deprecatedBuiltinCode)
+
+
+def fold_tflite(source: Path, target: Path, assets: vision.Assets) -> None:
+    """Writes a single-channel copy of a LiteRT encoder whose NCHW input feeds a convolution.
+
+    Converters lay convolutions out NHWC, so the input usually passes through a
+    transpose first; its output shape is narrowed to one channel with it.
+
+    Raises:
+        ValueError: If the graph does not start with a float convolution.
+    """
+    model = schema.ModelT.InitFromPackedBuf(source.read_bytes(), 0)
+    graph = model.subgraphs[0]
+    tensors = graph.tensors
+    model_input = tensors[graph.inputs[0]]
+    if len(model_input.shape) != 4 or model_input.shape[1] != 3:
+        raise ValueError("input is not a three-channel NCHW tensor")
+    narrowed = [model_input]
+    feed = graph.inputs[0]
+    consumers = [operator for operator in graph.operators if feed in operator.inputs]
+    if len(consumers) == 1 and _builtin(model, consumers[0]) == schema.BuiltinOperator.TRANSPOSE:
+        feed = consumers[0].outputs[0]
+        narrowed.append(tensors[feed])
+        consumers = [operator for operator in graph.operators if feed in operator.inputs]
+    if len(consumers) != 1 or _builtin(model, consumers[0]) != schema.BuiltinOperator.CONV_2D:
+        raise ValueError("input does not feed a single convolution")
+    conv = consumers[0]
+    conv.inputs, conv.outputs = list(conv.inputs), list(conv.outputs)
+    if list(tensors[feed].shape[1:]) != [vision.INPUT_SIZE, vision.INPUT_SIZE, 3]:
+        raise ValueError("first convolution does not read the frame as NHWC")
+    weights_tensor = tensors[conv.inputs[1]]
+    data = model.buffers[weights_tensor.buffer].data
+    if weights_tensor.type != schema.TensorType.FLOAT32 or data is None:
+        raise ValueError("first convolution weights are not constant float32")
+    weights = np.frombuffer(bytes(data), dtype=np.float32).reshape(weights_tensor.shape).transpose(0, 3, 1, 2)
+    options = conv.builtinOptions
+    strides = (options.strideH, options.strideW)
+    dilations = (options.dilationHFactor, options.dilationWFactor)
+    kernel = weights.shape[2:]
+    if options.padding == schema.Padding.SAME:
+        (out_h, pad_h), (out_w, pad_w) = (
+            _same_padding(kernel[axis], strides[axis], dilations[axis]) for axis in (0, 1)
+        )
+    else:
+        out_h, out_w = (_valid_size(kernel[axis], strides[axis], dilations[axis]) for axis in (0, 1))
+        pad_h = pad_w = 0
+    mean_map = _mean_map(weights, assets, (out_h, out_w), strides, dilations, (pad_h, pad_w))
+
+    def constant(name: str, array: np.ndarray) -> int:
+        buffer = schema.BufferT()
+        buffer.data = np.frombuffer(np.ascontiguousarray(array, dtype=np.float32).tobytes(), dtype=np.uint8)
+        model.buffers.append(buffer)
+        tensor = schema.TensorT()
+        tensor.name, tensor.shape, tensor.type = name.encode(), list(array.shape), schema.TensorType.FLOAT32
+        tensor.buffer = len(model.buffers) - 1
+        tensors.append(tensor)
+        return len(tensors) - 1
+
+    folded = _fold_weights(weights, assets).transpose(0, 2, 3, 1)
+    conv.inputs[1] = constant(f"{weights_tensor.name.decode()}{MONO_SUFFIX}", folded)
+    output = tensors[conv.outputs[0]]
+    raw = schema.TensorT()
+    raw.name, raw.shape, raw.type = output.name + b"_raw", list(output.shape), output.type
+    raw.shapeSignature = output.shapeSignature
+    tensors.append(raw)
+    mean = constant(f"{output.name.decode()}{MONO_SUFFIX}_mean", mean_map.transpose(1, 2, 0)[np.newaxis])
+    add = schema.OperatorT()
+    codes = [max(code.builtinCode, code.deprecatedBuiltinCode) for code in model.operatorCodes]
+    add.opcodeIndex = codes.index(schema.BuiltinOperator.ADD) if schema.BuiltinOperator.ADD in codes else len(codes)
+    if add.opcodeIndex == len(codes):
+        code = schema.OperatorCodeT()
+        code.builtinCode = code.deprecatedBuiltinCode = schema.BuiltinOperator.ADD
+        code.version = 1
+        model.operatorCodes.append(code)
+    add.inputs, add.outputs = [len(tensors) - 2, mean], [conv.outputs[0]]
+    add.builtinOptionsType = schema.BuiltinOptions.AddOptions
+    add.builtinOptions = schema.AddOptionsT()
+    add.builtinOptions.fusedActivationFunction = options.fusedActivationFunction
+    options.fusedActivationFunction = schema.ActivationFunctionType.NONE
+    conv.outputs[0] = len(tensors) - 2
+    graph.operators.insert(graph.operators.index(conv) + 1, add)
+    for tensor in narrowed:
+        channel = 1 if tensor is model_input else 3
+        tensor.shape = [1 if axis == channel else size for axis, size in enumerate(tensor.shape)]
+        if tensor.shapeSignature is not None and len(tensor.shapeSignature):
+            signature = tensor.shapeSignature
+            tensor.shapeSignature = [1 if axis == channel else size for axis, size in enumerate(signature)]
+
+    builder = flatbuffers.Builder(1024)
+    builder.Finish(model.Pack(builder), file_identifier=b"TFL3")
+    target.write_bytes(builder.Output())
+
+
+def verify(source: Path, target: Path) -> float:
+    """Largest embedding difference between an encoder and its folded copy, relative to the embedding."""
+    backend = OnnxInference if source.suffix == ".onnx" else LiteRtInference
+    original, folded = backend(source), backend(target)
+    try:
+        if folded.input_kind != "grey":
+            raise ValueError("folded encoder does not read grey levels")
+        shape = (VERIFY_FRAMES, vision.INPUT_SIZE, vision.INPUT_SIZE)
+        samples = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+        expected = np.concatenate([original.run(sample[np.newaxis]) for sample in samples])
+        actual = np.concatenate([folded.run(sample[np.newaxis]) for sample in samples])
+        return float(np.abs(expected - actual).max() / (np.abs(expected).max() or 1.0))
+    finally:
+        original.close()
+        folded.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Folds every encoder in a model directory, keeping only the copies that match their original."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("model_dir", nargs="?", type=Path, default=Path(os.environ.get("MODEL_DIR", "models")))
+    model_dir = parser.parse_args(argv).model_dir
+    logs.setup_from_env()
+    assets = _load_assets(model_dir)
+    for source in sorted(model_dir.glob("encoder_*")):
+        if source.suffix not in (".onnx", ".tflite") or source.stem.endswith(MONO_SUFFIX):
+            continue
+        target = source.with_name(f"{source.stem}{MONO_SUFFIX}{source.suffix}")
+        try:
+            (fold_onnx if source.suffix == ".onnx" else fold_tflite)(source, target, assets)
+            drift = verify(source, target)
+        except (ValueError, ImportError) as exc:
+            target.unlink(missing_ok=True)
+            logger.warning("%s: not folded, %s", source.name, exc)
+            continue
+        if drift > VERIFY_TOLERANCE:
+            target.unlink()
+            logger.warning("%s: not folded, embeddings moved by %.1e", source.name, drift)
+            continue
+        logger.info("%s: wrote %s, embeddings within %.1e", source.name, target.name, drift)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,7 +22,7 @@ import httpx
 import numpy as np
 from av.video.reformatter import VideoReformatter
 from ..engine import vision
-from ..engine.platform import Frame
+from ..engine.platform import BATCH_WINDOW_S, Frame
 from .bambu_camera import open_bambu_jpeg_stream
 from .inference import Inference
 from .mediamtx import MediaMTX, pull_source
@@ -34,12 +34,19 @@ OPEN_WAIT_S = 25.0
 CAMERA_CONSENT_WAIT_S = 60.0
 RECONNECT_DELAY_S = 3.0
 DEMAND_IDLE_S = 10.0
+REVALIDATE_AFTER_S = 60.0
+REBALANCE_INTERVAL_S = 15.0
 MJPEG_LIVE_OPTIONS = {"analyzeduration": "0", "probesize": "32"}
 DEVICE_OPEN_OPTIONS = ({"framerate": "30"}, {"framerate": "15"}, {})
 """Frame rates tried, most common first, when a device's own capture formats
 cannot be read ahead of time (Windows/Linux); macOS pins a real size and rate
 from AVFoundation in _device_open_options."""
 DEVICE_SIZE_CAP = 1280 * 720
+LUMA_PLANE_FORMATS = frozenset(
+    {"yuv420p", "yuvj420p", "yuv422p", "yuvj422p", "yuv444p", "yuvj444p", "yuv440p", "yuvj440p", "nv12", "nv21"}
+)
+"""8-bit pixel formats whose first plane is full-resolution luminance, which
+inference reads in place rather than converting the frame."""
 DEVICE_PIXEL_FORMATS = {"420v": "nv12", "420f": "nv12", "yuvs": "yuyv422", "2vuy": "uyvy422"}
 """AVFoundation format subtypes mapped to ffmpeg pixel formats. avfoundation
 defaults to yuv420p, which it silently downgrades to the packed uyvy422 formats
@@ -209,6 +216,15 @@ def _authorize_macos_camera() -> None:
     )
 
 
+def _luma_plane(frame: av.VideoFrame) -> np.ndarray:
+    plane = frame.planes[0]
+    return np.frombuffer(plane, dtype=np.uint8).reshape(plane.height, plane.line_size)[:, : plane.width]
+
+
+def _decode_rgb(frame: av.VideoFrame) -> np.ndarray:
+    return VideoReformatter().reformat(frame, format="rgb24", threads=1).to_ndarray()
+
+
 class AVSource:
     """Continuously decodes a stream, keeping only the freshest frame.
 
@@ -222,6 +238,11 @@ class AVSource:
     for the reason H264Push documents, and one conversion at a time: a scaler
     is a single FFmpeg context, and the scheduler and a snapshot request can
     both ask for the freshest frame at once.
+
+    Inference only reads luminance, so a frame grabbed for it skips the RGB
+    conversion: planar YUV frames lend their Y plane as is, and anything else
+    is scaled to grey, which costs a fraction of RGB. The RGB frame is decoded
+    only if the frame ends up in a snapshot or an alert.
     """
 
     def __init__(
@@ -240,6 +261,7 @@ class AVSource:
         self.last_error: str | None = None
         self._latest: tuple[av.VideoFrame, float, float] | None = None
         self._latest_rgb: Frame | None = None
+        self._latest_luma: Frame | None = None
         self._reformatter = VideoReformatter()
         self._converting = asyncio.Lock()
         self._seq = 0
@@ -361,24 +383,37 @@ class AVSource:
             except av.error.BlockingIOError:
                 time.sleep(0.02)
 
-    async def grab(self) -> Frame | None:
-        """Converts and returns the freshest decoded frame."""
+    async def grab(self, luma: bool = False) -> Frame | None:
+        """Converts and returns the freshest decoded frame, as luminance if asked."""
         latest = self._latest
         if latest is None:
             return None
         frame, seq, ts = latest
         async with self._converting:
-            if self._latest_rgb is not None and self._latest_rgb.seq == seq:
-                return self._latest_rgb
-            rgb = await asyncio.to_thread(self._to_rgb, frame)
-            result = Frame(rgb=rgb, seq=seq, ts=ts)
+            cached = self._latest_luma if luma else self._latest_rgb
+            if cached is not None and cached.seq == seq:
+                return cached
+            if not luma:
+                result = Frame(rgb=await asyncio.to_thread(self._to_rgb, frame), seq=seq, ts=ts)
+            elif frame.format.name in LUMA_PLANE_FORMATS:
+                limited = not frame.format.name.startswith("yuvj") and frame.color_range != 2
+                result = Frame(rgb=None, seq=seq, ts=ts, luma=_luma_plane(frame), limited=limited, decode=partial(_decode_rgb, frame))
+            else:
+                grey = await asyncio.to_thread(self._to_grey, frame)
+                result = Frame(rgb=None, seq=seq, ts=ts, luma=grey, decode=partial(_decode_rgb, frame))
             if self._latest is latest:
-                self._latest_rgb = result
+                if luma:
+                    self._latest_luma = result
+                else:
+                    self._latest_rgb = result
             return result
 
     def _to_rgb(self, frame: av.VideoFrame) -> np.ndarray:
         return self._reformatter.reformat(frame, format="rgb24", threads=1).to_ndarray()
 
+    def _to_grey(self, frame: av.VideoFrame) -> np.ndarray:
+        return self._reformatter.reformat(frame, format="gray", threads=1).to_ndarray()
+
     def close(self) -> None:
         """Stops the reader thread."""
         self._stop = True
@@ -399,45 +434,130 @@ class ServerPlatform:
         self.update_asset = update_asset
         data_dir.mkdir(parents=True, exist_ok=True)
         self._model_dir = model_dir
+        self._benchmark_path = data_dir / "benchmarks.json"
+        self._graph_dir = data_dir / "graphs"
         self._inference: Inference | None = None
+        self._revalidation: asyncio.Task[None] | None = None
+        self._rebalancing: asyncio.Task[None] | None = None
+        self._embeddings: list[np.ndarray] = []
+        self._batch_window_s = BATCH_WINDOW_S
         self.workers = 1
         self.inference_device = "Initialising"
-        meta = json.loads((model_dir / "metadata.json").read_text())
-        protos = json.loads((model_dir / "prototypes.json").read_text())["prototypes"]
-        self.assets = vision.assets_from_dicts(meta, protos)
+        self.assets = self._load_assets()
         self._state_path = data_dir / "state.json"
         self._client = httpx.AsyncClient(follow_redirects=True)
         self.mediamtx = MediaMTX(mediamtx_api, mediamtx_rtsp, self._client)
         self._sources: dict[str, AVSource] = {}
 
     async def configure(self, settings: dict[str, Any]) -> None:
-        """Selects the requested inference runtime."""
+        """Selects the requested inference runtime, reading the model directory afresh.
+
+        The new runtime is built, benchmarked where needed and warmed in a
+        thread while the current one keeps serving frames, then swapped in
+        with the model's metadata and prototypes in one step. The previous
+        runtime closes once the frames it is still serving are answered, so a
+        runtime change or a model reload never pauses monitoring. A benchmark
+        taken during such a swap competes with the live runtime for the CPU,
+        so it is used but not saved, and the next start measures afresh.
+
+        A benchmark reused from an earlier start is checked in the background
+        once monitoring has been running for a while, and the worker count is
+        rebalanced against the CPU quota and observed latency from then on.
+        """
         runtime = settings["inference_runtime"]
-        inference = await asyncio.to_thread(Inference, self._model_dir, runtime)
+        assets = await asyncio.to_thread(self._load_assets)
+        inference = await asyncio.to_thread(
+            Inference,
+            self._model_dir,
+            runtime,
+            self._benchmark_path,
+            self._graph_dir,
+            contended=self._inference is not None,
+        )
+        inference.batch_window_s = self._batch_window_s
         previous = self._inference
-        self._inference = inference
-        self.workers = inference.workers
+        self._inference, self.assets = inference, assets
+        self._embeddings = []
+        self.workers = inference.slots
         self.inference_device = inference.device
+        for task in (self._revalidation, self._rebalancing):
+            if task is not None:
+                task.cancel()
+        self._revalidation = None
         if previous is not None:
-            previous.close()
+            previous.retire()
+        if inference.cached:
+            self._revalidation = asyncio.create_task(self._revalidate(inference))
+        self._rebalancing = asyncio.create_task(self._rebalance(inference))
         logger.info(
-            "inference ready: %s via %s (%d workers, %.0f fps)",
+            "inference ready: %s via %s (%d workers, batch %d, %.0f fps)",
             self.inference_device,
             inference.runtime if runtime == "auto" else runtime,
-            self.workers,
+            inference.workers,
+            inference.batch,
             inference.capacity_fps,
         )
 
+    def set_inference_mode(self, mode: str) -> None:
+        """Applies the mode to the serving runtime, which resizes the pool the scheduler reads."""
+        if self._inference is not None and self._inference.set_mode(mode):
+            self.workers = self._inference.slots
+
+    def set_batch_window(self, seconds: float) -> None:
+        """Applies the window to the serving runtime, and to any runtime configured later."""
+        self._batch_window_s = seconds
+        if self._inference is not None:
+            self._inference.batch_window_s = seconds
+
+    def _load_assets(self) -> vision.Assets:
+        meta = json.loads((self._model_dir / "metadata.json").read_text())
+        protos = json.loads((self._model_dir / "prototypes.json").read_text())["prototypes"]
+        return vision.assets_from_dicts(meta, protos)
+
+    async def _revalidate(self, inference: Inference) -> None:
+        await asyncio.sleep(REVALIDATE_AFTER_S)
+        try:
+            await asyncio.to_thread(inference.revalidate)
+        except Exception:
+            logger.warning("inference benchmark revalidation failed", exc_info=True)
+
+    async def _rebalance(self, inference: Inference) -> None:
+        """Follows the runtime's worker count, which the scheduler reads on every dispatch."""
+        while True:
+            await asyncio.sleep(REBALANCE_INTERVAL_S)
+            if inference.rebalance():
+                self.workers = inference.slots
+
     async def close(self) -> None:
         """Releases the HTTP client, and the inference workers once a runtime is up."""
+        for task in (self._revalidation, self._rebalancing):
+            if task is not None:
+                task.cancel()
         await self._client.aclose()
         if self._inference is not None:
             self._inference.close()
 
-    async def infer(self, rgb: np.ndarray) -> dict[str, Any]:
-        """Runs the model through the selected hardware provider."""
-        tensor = await asyncio.to_thread(vision.preprocess, rgb, self.assets)
-        return vision.classify(await self._inference.run(tensor), self.assets)
+    async def infer(self, rgb: np.ndarray, plan: vision.Plan | None = None) -> dict[str, Any]:
+        """Runs the model through the selected hardware provider.
+
+        The frame goes to the runtime raw and is sampled through the plan on
+        the worker thread that runs the model. The embedding lands in a buffer
+        reused across frames, one per frame in flight, since it is only needed
+        until the frame is classified. The runtime fills it on the event loop
+        once the worker is done, never from the worker itself, so a cancelled
+        frame can hand it back straight away. A frame keeps the runtime and model it
+        started with until it is answered, so a switch part-way through never
+        mixes two models.
+        """
+        inference, assets = self._inference, self.assets
+        with inference.serving():
+            reuse = self._embeddings if inference is self._inference else []
+            out = reuse.pop() if reuse else np.empty(inference.embedding_size, dtype=np.float32)
+            try:
+                return vision.classify(await inference.run(rgb, plan, out), assets)
+            finally:
+                if inference is self._inference:
+                    self._embeddings.append(out)
 
     async def discover_cameras(self) -> list[dict[str, Any]]:
         """Lists the host's video devices and active MediaMTX paths as attachable sources."""
@@ -545,16 +665,17 @@ class ServerPlatform:
         except ValueError:
             return resp.status_code, resp.text
 
-    async def encode_jpeg(self, rgb: np.ndarray) -> bytes | None:
-        """Encodes a frame as JPEG using PyAV's mjpeg encoder."""
+    async def encode_jpeg(self, frame: Frame) -> bytes | None:
+        """Renders a frame's view and encodes it as JPEG with PyAV's mjpeg encoder, in one worker thread."""
         def encode() -> bytes:
+            rgb = frame.view()
             even = rgb[: rgb.shape[0] // 2 * 2, : rgb.shape[1] // 2 * 2]
-            frame = av.VideoFrame.from_ndarray(np.ascontiguousarray(even), format="rgb24")
+            picture = av.VideoFrame.from_ndarray(np.ascontiguousarray(even), format="rgb24")
             codec = av.CodecContext.create("mjpeg", "w")
-            codec.width, codec.height = frame.width, frame.height
+            codec.width, codec.height = picture.width, picture.height
             codec.pix_fmt = "yuvj420p"
             codec.time_base = Fraction(1, 30)
-            packets = codec.encode(frame.reformat(format="yuvj420p", threads=1)) + codec.encode(None)
+            packets = codec.encode(picture.reformat(format="yuvj420p", threads=1)) + codec.encode(None)
             return b"".join(bytes(p) for p in packets)
 
         try:
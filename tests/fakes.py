@@ -4,29 +4,35 @@ from __future__ import annotations
 
 import asyncio
 import time
-from typing import Any
+from typing import Any, Callable
 from urllib.parse import urlparse
 
 import numpy as np
 
+from printguard.engine import vision
 from printguard.engine.platform import Frame
 
 
 class FakeSource:
-    """Synthetic camera producing frames at a fixed rate."""
+    """Synthetic camera producing frames at a fixed rate on the given clock."""
 
-    def __init__(self, fps: float) -> None:
+    def __init__(self, fps: float, clock: Callable[[], float] = time.monotonic) -> None:
         self.fps = fps
         self.online = True
         self.standby = False
         self.frozen = False
-        self._born = time.monotonic()
+        self._clock = clock
+        self._born = clock()
 
-    async def grab(self) -> Frame | None:
-        seq = 0 if self.frozen else int((time.monotonic() - self._born) * self.fps)
-        rgb = np.full((48, 64, 3), seq % 255, dtype=np.uint8)
+    async def grab(self, luma: bool = False) -> Frame | None:
+        seq = 0 if self.frozen else int((self._clock() - self._born) * self.fps)
+        rgb = np.full((48, 64, 3), self.shade(seq), dtype=np.uint8)
         return Frame(rgb=rgb, seq=float(seq), ts=time.time())
 
+    def shade(self, seq: int) -> int:
+        """Grey level of a frame; far apart between frames, so none reads as a repeat."""
+        return seq * 101 % 256
+
     def set_monitoring(self, active: bool) -> None:
         self.standby = not active
         self.online = active
@@ -45,8 +51,9 @@ class FakePlatform:
     update_repo: str | None = None
     update_asset: str | None = None
 
-    def __init__(self, infer_s: float = 0.05, failing: bool = False) -> None:
+    def __init__(self, infer_s: float = 0.05, failing: bool = False, clock: Callable[[], float] = time.monotonic) -> None:
         self.infer_s = infer_s
+        self.clock = clock
         self.failing = failing
         self.device_status = "Printing"
         self.reject_actions = False
@@ -61,12 +68,22 @@ class FakePlatform:
         self.released_cameras: list[str] = []
         self.state: dict[str, Any] = {}
         self.inference_runtime = "auto"
+        self.inference_modes: list[str] = []
+        self.batch_window_s = 0.0
 
     async def configure(self, settings: dict[str, Any]) -> None:
         """Records the selected inference runtime."""
         self.inference_runtime = settings["inference_runtime"]
 
-    async def infer(self, rgb: np.ndarray) -> dict[str, Any]:
+    def set_inference_mode(self, mode: str) -> None:
+        """Records each inference mode the scheduler asks for."""
+        self.inference_modes.append(mode)
+
+    def set_batch_window(self, seconds: float) -> None:
+        """Records the batch window the engine sets."""
+        self.batch_window_s = seconds
+
+    async def infer(self, rgb: np.ndarray, plan: vision.Plan | None = None) -> dict[str, Any]:
         self.inference_started.set()
         if self.inference_blocked:
             await asyncio.Event().wait()
@@ -78,7 +95,7 @@ class FakePlatform:
         return []
 
     async def open_camera(self, camera_id: str, source: dict[str, Any]) -> FakeSource:
-        return FakeSource(float(source.get("fps", 15.0)))
+        return FakeSource(float(source.get("fps", 15.0)), self.clock)
 
     async def release_camera(self, camera_id: str, source: dict[str, Any]) -> None:
         self.released_cameras.append(camera_id)
@@ -98,7 +115,8 @@ class FakePlatform:
             raise RuntimeError("printer refused")
         return 200, {"state": self.device_status, "progress": {"completion": 40.0}, "job": {"file": {"name": "benchy.gcode"}}}
 
-    async def encode_jpeg(self, rgb: np.ndarray) -> bytes | None:
+    async def encode_jpeg(self, frame: Frame) -> bytes | None:
+        frame.view()
         return b"\xff\xd8fake"
 
     async def decode_jpeg(self, data: bytes) -> np.ndarray | None:
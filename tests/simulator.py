@@ -0,0 +1,311 @@
+"""Deterministic scheduler simulation in virtual time.
+
+Runs the real engine, scheduler and watchdog included, against the in-memory
+platform on an event loop whose clock moves only when every task is waiting,
+jumping straight to the next timer. Processing costs no simulated time, so an
+hour of a farm with hundreds of cameras runs in seconds, and the same seed
+always gives the same run. The report covers fairness, achieved rates, the
+real time spent per frame dispatched, and how long each failure took to alert::
+
+    uv run python tests/simulator.py --cameras 300 --fps 15 --workers 4 --latency 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import selectors
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import numpy as np
+from fakes import FakePlatform, FakeSource
+
+from printguard.engine import vision
+from printguard.engine.engine import Engine
+from printguard.engine.platform import Frame
+
+HEALTHY = (0, 255, 0)
+FAILING = (255, 0, 255)
+SAMPLE_S = 1.0
+
+
+class VirtualClock:
+    """Simulated monotonic seconds, advanced only by the loop running on it."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """Polls without blocking, and moves the clock on by the time the loop would have slept."""
+
+    def __init__(self, clock: VirtualClock) -> None:
+        super().__init__()
+        self._clock = clock
+
+    def select(self, timeout: float | None = None) -> list[tuple[selectors.SelectorKey, int]]:
+        ready = super().select(0)
+        if not ready and timeout:
+            self._clock.now += timeout
+        elif not ready and timeout is None:
+            raise RuntimeError("simulation stalled: no task is runnable and no timer is set")
+        return ready
+
+
+class VirtualLoop(asyncio.SelectorEventLoop):
+    """An event loop on a virtual clock, for code that does no real I/O or threading."""
+
+    def __init__(self, clock: VirtualClock) -> None:
+        super().__init__(_VirtualSelector(clock))
+        self._virtual = clock
+
+    def time(self) -> float:
+        return self._virtual.now
+
+
+@dataclass
+class SimCamera:
+    """One simulated camera and the print it watches.
+
+    Attributes:
+        fps: Native frame rate.
+        grab_s: Time to grab and convert one of its frames.
+        fails_at: When the print starts failing, or None for a clean print.
+        offline: Start and end of a dropout, or None.
+        detect_within_s: Detection deadline of its monitor, 0 for none.
+    """
+
+    fps: float = 15.0
+    grab_s: float = 0.0
+    fails_at: float | None = None
+    offline: tuple[float, float] | None = None
+    detect_within_s: float = 0.0
+
+
+@dataclass
+class Simulation:
+    """A simulated hub.
+
+    Attributes:
+        cameras: The cameras, each watched by one monitor.
+        workers: Inference workers.
+        latency: Draws one model call's duration from the seeded generator.
+        duration_s: Simulated time to run for.
+        warmup_s: Time excluded from the measured rates while capacity is learnt.
+        seed: Seed for the latency draws.
+        settings: Settings patch applied before the cameras are added.
+    """
+
+    cameras: list[SimCamera]
+    workers: int = 1
+    latency: Callable[[random.Random], float] = lambda rng: 0.05
+    duration_s: float = 60.0
+    warmup_s: float = 10.0
+    seed: int = 0
+    settings: dict[str, Any] = field(default_factory=dict)
+
+
+class SimSource(FakeSource):
+    """Fake camera that takes time to grab, drops out on cue and marks frames of a failing print."""
+
+    def __init__(self, spec: SimCamera, clock: Callable[[], float]) -> None:
+        super().__init__(spec.fps, clock)
+        self._spec = spec
+
+    @property
+    def online(self) -> bool:
+        dropout = self._spec.offline
+        return self._online and not (dropout and dropout[0] <= self._clock() < dropout[1])
+
+    @online.setter
+    def online(self, value: bool) -> None:
+        self._online = value
+
+    async def grab(self, luma: bool = False) -> Frame | None:
+        if self._spec.grab_s:
+            await asyncio.sleep(self._spec.grab_s)
+        if not self.online:
+            return None
+        frame = await super().grab(luma)
+        failing = self._spec.fails_at is not None and self._clock() >= self._spec.fails_at
+        frame.rgb[0, 0] = FAILING if failing else HEALTHY
+        return frame
+
+
+class SimPlatform(FakePlatform):
+    """Fake platform whose model takes a drawn time and fails frames marked as failing."""
+
+    def __init__(self, sim: Simulation, clock: Callable[[], float]) -> None:
+        super().__init__(clock=clock)
+        self.workers = sim.workers
+        self._sim = sim
+        self._rng = random.Random(sim.seed)
+
+    async def open_camera(self, camera_id: str, source: dict[str, Any]) -> SimSource:
+        return SimSource(self._sim.cameras[source["index"]], self.clock)
+
+    async def infer(self, rgb: np.ndarray, plan: vision.Plan | None = None) -> dict[str, Any]:
+        await asyncio.sleep(max(0.0, self._sim.latency(self._rng)))
+        failing = tuple(rgb[0, 0]) == FAILING
+        distances = {"success": 9.0, "failure": 1.0} if failing else {"success": 1.0, "failure": 9.0}
+        return {"prediction": "failure" if failing else "success", "distances": distances, "margin": 8.0}
+
+
+def _fair_shares(total: float, demands: list[float]) -> list[float]:
+    """Max-min fair split of a total rate across demands."""
+    shares = [0.0] * len(demands)
+    for rank, index in enumerate(sorted(range(len(demands)), key=demands.__getitem__)):
+        shares[index] = min(demands[index], total / (len(demands) - rank))
+        total -= shares[index]
+    return shares
+
+
+def _jain(values: list[float]) -> float:
+    """Jain's fairness index: 1.0 when all values are equal, 1/n when one takes everything."""
+    squares = sum(v * v for v in values)
+    return sum(values) ** 2 / (len(values) * squares) if squares else 1.0
+
+
+async def _run(sim: Simulation, clock: VirtualClock) -> dict[str, Any]:
+    engine = Engine(SimPlatform(sim, clock), clock)
+    await engine.start()
+    alerted: dict[str, float] = {}
+    warned: set[str] = set()
+
+    def sink(event: dict[str, Any]) -> None:
+        if event.get("event") == "alert":
+            alerted.setdefault(event["monitor_id"], clock())
+        elif event.get("event") == "warning" and not event["recovered"]:
+            warned.add(event["monitor_id"])
+
+    engine.add_sink(sink)
+    if sim.settings:
+        await engine.handle({"cmd": "settings.update", "patch": sim.settings})
+    for index, spec in enumerate(sim.cameras):
+        await engine.handle({"cmd": "camera.add", "name": f"cam{index}", "source": {"kind": "fake", "fps": spec.fps, "index": index}})
+    cameras = list(engine.cameras.values())
+    for camera, spec in zip(cameras, sim.cameras):
+        monitor = {"name": camera.name, "camera_id": camera.id, "detect_within_s": spec.detect_within_s}
+        await engine.handle({"cmd": "monitor.add", "monitor": monitor})
+    monitors = {m["camera_id"]: m["id"] for m in engine.monitors.values()}
+
+    counts = dict.fromkeys(monitors, 0)
+    on_result = engine.scheduler._on_result
+
+    async def counted(camera: Any, frame: Frame, result: dict[str, Any]) -> None:
+        if clock() >= sim.warmup_s:
+            counts[camera.id] += 1
+        await on_result(camera, frame, result)
+
+    engine.scheduler._on_result = counted
+    allocations = [0]
+    allocate = engine.scheduler.allocate
+
+    def counted_allocate() -> None:
+        if clock() >= sim.warmup_s:
+            allocations[0] += 1
+        allocate()
+
+    engine.scheduler.allocate = counted_allocate
+    await asyncio.sleep(sim.warmup_s)
+    started = time.perf_counter()
+    capacities: list[float] = []
+    while clock() < sim.duration_s:
+        await asyncio.sleep(min(SAMPLE_S, sim.duration_s - clock()))
+        capacities.append(engine.scheduler.capacity_fps())
+    wall_s = time.perf_counter() - started
+    capacity = sum(capacities) / len(capacities)
+    await engine.stop()
+
+    measured_s = sim.duration_s - sim.warmup_s
+    achieved = [counts[camera.id] / measured_s for camera in cameras]
+    steady = [i for i, spec in enumerate(sim.cameras) if spec.fails_at is None and spec.offline is None]
+    shares = _fair_shares(sum(achieved[i] for i in steady), [sim.cameras[i].fps for i in steady])
+    ratios = [achieved[i] / share for i, share in zip(steady, shares) if share > 0]
+    frames = sum(counts.values())
+    return {
+        "cameras": len(cameras),
+        "duration_s": sim.duration_s,
+        "capacity_fps": round(capacity, 2),
+        "achieved_fps": round(sum(achieved), 2),
+        "utilisation": round(sum(achieved) / capacity, 3) if capacity else 0.0,
+        "fairness": round(_jain(ratios), 4),
+        "min_share": round(min(ratios, default=1.0), 3),
+        "camera_fps": {camera.name: round(rate, 3) for camera, rate in zip(cameras, achieved)},
+        "detection_s": {
+            camera.name: round(alerted[monitors[camera.id]] - spec.fails_at, 3) if monitors[camera.id] in alerted else None
+            for camera, spec in zip(cameras, sim.cameras)
+            if spec.fails_at is not None
+        },
+        "warned": sorted(camera.name for camera in cameras if monitors[camera.id] in warned),
+        "allocations": allocations[0],
+        "wall_s": round(wall_s, 3),
+        "dispatch_us": round(1e6 * wall_s / frames, 1) if frames else 0.0,
+    }
+
+
+def simulate(sim: Simulation) -> dict[str, Any]:
+    """Runs a simulation to completion on a fresh virtual-time loop and returns its report.
+
+    `fairness` is Jain's index of each steady camera's achieved rate over its
+    max-min fair share of the total achieved, counted in frames: 1.0 when every
+    camera gets its share. Cameras that fail or drop out are left out of it,
+    since the scheduler deliberately favours or skips them. `capacity_fps` is
+    the scheduler's estimate averaged over the measured span, and
+    `allocations` how often it re-ran its allocation there. `detection_s` is
+    how long after each failure its monitor alerted, None if it never did.
+    `wall_s` is the real time the measured span took, and `dispatch_us` that
+    per frame: everything the engine does, state broadcasts and watchdog
+    included. Only these two vary between runs.
+    """
+    clock = VirtualClock()
+    with asyncio.Runner(loop_factory=lambda: VirtualLoop(clock)) as runner:
+        return runner.run(_run(sim, clock))
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Simulates a hub of identical cameras and prints the report as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cameras", type=int, default=100)
+    parser.add_argument("--fps", type=float, default=15.0, help="native frame rate of each camera")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.02, help="median model call in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="spread of the lognormal latency")
+    parser.add_argument("--grab", type=float, default=0.0, help="seconds to grab each frame")
+    parser.add_argument("--failures", type=int, default=0, help="cameras whose print fails halfway through")
+    parser.add_argument("--detect-within", type=float, default=0.0, help="detection deadline for the failing prints")
+    parser.add_argument("--duration", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--per-camera", action="store_true", help="include each camera's achieved rate")
+    args = parser.parse_args(argv)
+    cameras = [
+        SimCamera(
+            fps=args.fps,
+            grab_s=args.grab,
+            fails_at=args.duration / 2 if index < args.failures else None,
+            detect_within_s=args.detect_within if index < args.failures else 0.0,
+        )
+        for index in range(args.cameras)
+    ]
+    sim = Simulation(
+        cameras=cameras,
+        workers=args.workers,
+        latency=lambda rng: rng.lognormvariate(0.0, args.jitter) * args.latency,
+        duration_s=args.duration,
+        seed=args.seed,
+    )
+    report = simulate(sim)
+    if not args.per_camera:
+        report.pop("camera_fps")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -684,6 +684,7 @@ def test_sanitise_monitor_clamps_and_defaults() -> None:
             "sensitivity": 0,
             "consecutive": 99,
             "cooldown_s": 10_000,
+            "detect_within_s": -5,
             "on_defect": "explode",
         },
     )
@@ -692,6 +693,7 @@ def test_sanitise_monitor_clamps_and_defaults() -> None:
     assert record["sensitivity"] == 0.2
     assert record["consecutive"] == 30
     assert record["cooldown_s"] == 600
+    assert record["detect_within_s"] == 0
     assert record["on_defect"] == "none"
 
 
@@ -14,6 +14,7 @@ import pytest
 from fakes import FakePlatform
 from printguard.engine.engine import Engine
 from printguard.engine.registry import Camera
+from printguard.engine.scheduler import InferenceBusy
 from printguard.server.api import ApiAuth, build_api_app
 
 OCTOPRINT = {"provider": "octoprint", "config": {"base_url": "http://op", "api_key": "k"}}
@@ -92,6 +93,14 @@ async def test_classify_endpoint_reads_a_supplied_frame() -> None:
         assert bad.status_code == 400
 
 
+async def test_classify_turned_away_for_live_monitoring_is_retryable(monkeypatch) -> None:
+    """A frame the scheduler will not admit answers 503 with Retry-After, not a client error."""
+    async with api() as (client, engine, *_):
+        monkeypatch.setattr(engine.scheduler, "infer", AsyncMock(side_effect=InferenceBusy("busy")))
+        response = await client.post("/classify", content=b"\xff\xd8jpeg", headers={"Content-Type": "image/jpeg"})
+        assert response.status_code == 503 and response.headers["retry-after"] == "1"
+
+
 async def test_baseline_is_read_only_without_tokens() -> None:
     async with api() as (client, _engine, _platform, _monitor_id, printer_id, camera_id, _tokens):
         assert (await client.get("/state")).status_code == 200
@@ -346,6 +355,28 @@ async def test_camera_source_converts_only_grabbed_frames(monkeypatch, scalers)
     assert [scaler.calls for scaler in scalers] == [[("rgb24", 1), ("rgb24", 1)]]
 
 
+async def test_camera_source_lends_the_luma_plane_for_inference(monkeypatch, scalers) -> None:
+    """A planar YUV frame grabbed for inference is read in place, converting to RGB only when viewed."""
+    import av
+
+    from printguard.server import platform
+
+    monkeypatch.setattr(platform.AVSource, "_run", lambda self: None)
+    decoded = av.VideoFrame.from_ndarray(np.full((48, 64, 3), 200, dtype=np.uint8), format="rgb24").reformat(format="yuv420p")
+
+    source = platform.AVSource("rtsp://mediamtx/camera")
+    source._latest = (decoded, 1.0, 2.0)
+    frame = await source.grab(luma=True)
+    source.close()
+
+    assert frame is not None and frame.rgb is None and frame.limited
+    assert frame.pixels.shape == (48, 64)
+    assert np.shares_memory(frame.pixels, np.frombuffer(decoded.planes[0], dtype=np.uint8))
+    assert [scaler.calls for scaler in scalers] == [[]]
+    assert frame.view().shape == (48, 64, 3)
+    assert [scaler.calls for scaler in scalers] == [[], [("rgb24", 1)]]
+
+
 def test_published_frames_share_one_single_threaded_scaler(monkeypatch, scalers) -> None:
     """Per-frame conversion reuses one single-threaded scaler.
 
@@ -8,15 +8,18 @@ import base64
 import io
 import json
 import logging
+import time
 import zipfile
 from contextlib import asynccontextmanager
 from urllib.parse import urlparse
 
 import numpy as np
-from fakes import FakePlatform
+import pytest
+from fakes import FakePlatform, FakeSource
 
-from printguard.engine import logs, reports, vision, watchdog
+from printguard.engine import logs, reports, scheduler, vision, watchdog
 from printguard.engine.engine import EVENT_LOG_LEVELS, Engine
+from printguard.engine.history import MonitorHistory
 from printguard.engine.integrations import INTEGRATIONS
 
 OCTOPRINT = {"provider": "octoprint", "config": {"base_url": "http://op", "api_key": "k"}}
@@ -75,6 +78,398 @@ async def test_fair_allocation_and_dedup() -> None:
     assert abs(fast_rate - mid_rate) < 4.0, f"fast/mid should share fairly: {fast_rate} vs {mid_rate}"
 
 
+async def test_suspected_failure_bursts_toward_native_rate(monkeypatch) -> None:
+    """A camera whose defect streak is under way takes capacity from a clean one, then gives it back."""
+    platform = FakePlatform(infer_s=0.05)
+    async with running_engine(platform, camera_fps=[30.0, 29.0]) as (engine, _):
+        suspect, clean = sorted(engine.cameras.values(), key=lambda camera: -camera.max_fps)
+        suspect_monitor = next(m for m in engine.monitors.values() if m["camera_id"] == suspect.id)
+        await engine.handle({"cmd": "monitor.update", "id": suspect_monitor["id"], "patch": {"sensitivity": 2.0, "consecutive": 30}})
+        monkeypatch.setattr(vision, "defect_score", lambda result, sensitivity: 0.9 if sensitivity == 2.0 else 0.0)
+        counts: dict[str, int] = {}
+        original = engine.scheduler._on_result
+
+        async def spy(camera, frame, result):
+            counts[camera.id] = counts.get(camera.id, 0) + 1
+            await original(camera, frame, result)
+
+        engine.scheduler._on_result = spy
+        await asyncio.sleep(1.5)
+        suspected = dict(counts)
+        monkeypatch.setattr(vision, "defect_score", lambda result, sensitivity: 0.0)
+        await asyncio.sleep(0.5)
+        cleared = suspect.risk, suspect.target_fps, clean.target_fps
+
+    assert suspected[suspect.id] > 2 * suspected[clean.id], f"suspect camera was not boosted: {suspected}"
+    assert cleared[0] == 0.0 and abs(cleared[1] - cleared[2]) < 0.5, f"boost outlived the suspicion: {cleared}"
+
+
+async def test_detection_deadline_reserves_rate_and_warns_when_short(monkeypatch) -> None:
+    """A monitor's deadline holds its camera's rate under overload, and one capacity cannot meet is named."""
+    monkeypatch.setattr(watchdog, "WATCH_TICK_S", 0.02)
+    monkeypatch.setattr(watchdog, "OFFLINE_GRACE_S", 0.2)
+    platform = FakePlatform(infer_s=0.05)
+    async with running_engine(platform, camera_fps=[30.0, 29.0, 28.0]) as (engine, events):
+        strict, loose, _ = sorted(engine.cameras.values(), key=lambda camera: -camera.max_fps)
+        monitors = {m["camera_id"]: m["id"] for m in engine.monitors.values()}
+        await engine.handle({"cmd": "monitor.update", "id": monitors[strict.id], "patch": {"consecutive": 3, "detect_within_s": 0.25}})
+        await asyncio.sleep(1.5)
+        held = strict.target_fps, loose.target_fps, engine.scheduler.capacity_fps()
+        assert not any(event.get("event") == "warning" for event in events), "a met deadline warned"
+        await engine.handle({"cmd": "monitor.update", "id": monitors[loose.id], "patch": {"consecutive": 30, "detect_within_s": 1}})
+        await asyncio.sleep(0.6)
+        warnings = [event for event in events if event.get("event") == "warning" and not event["recovered"]]
+
+    assert held[0] >= 0.95 * 12.0 > held[1], f"deadline rate not reserved: {held}"
+    assert monitors[loose.id] in {warning["monitor_id"] for warning in warnings}, "underserved monitor not named"
+    assert "needs 30 fps" in next(w["message"] for w in warnings if w["monitor_id"] == monitors[loose.id])
+
+
+@pytest.mark.parametrize("distance", [0.0, 4.0])
+async def test_repeated_frames_reuse_the_last_result(monkeypatch, distance: float) -> None:
+    """A still scene is answered from the last result, and only while reuse is switched on."""
+
+    class StillSource(FakeSource):
+        def shade(self, seq: int) -> int:
+            return 128
+
+    platform = FakePlatform(infer_s=0.02)
+    inferred: list[int] = []
+    infer = platform.infer
+
+    async def counted(rgb, plan=None):
+        inferred.append(1)
+        return await infer(rgb, plan)
+
+    monkeypatch.setattr(platform, "infer", counted)
+    monkeypatch.setattr(platform, "open_camera", lambda camera_id, source: asyncio.sleep(0, StillSource(20.0)))
+    async with running_engine(platform, camera_fps=[20.0]) as (engine, _):
+        await engine.handle({"cmd": "settings.update", "patch": {"frame_reuse_distance": distance}})
+        camera = engine.cameras.values()[0]
+        await asyncio.sleep(1.5)
+        served = camera.last_seq
+        stats = engine.scheduler.stats()
+
+    if distance:
+        assert len(inferred) <= 3, "a still scene should not keep the model busy"
+        assert stats["reuse_rate"] > 0.5 and stats["reused_fps"] > 0
+    else:
+        assert len(inferred) > 10 and stats["reuse_rate"] == 0.0
+    assert served > 10, "reused frames are still served at the camera's rate"
+
+
+@pytest.mark.parametrize("failing_calls", [1, 100])
+async def test_alert_needs_consecutive_model_calls_on_a_still_view(monkeypatch, failing_calls: int) -> None:
+    """A reused result never advances a defect streak: a one-off false positive on a still view is cleared on a fresh frame."""
+
+    class StillSource(FakeSource):
+        def shade(self, seq: int) -> int:
+            return 128
+
+    platform = FakePlatform(infer_s=0.02)
+    inferred: list[int] = []
+    infer = platform.infer
+
+    async def counted(rgb, plan=None):
+        inferred.append(1)
+        return {**await infer(rgb, plan), "call": len(inferred)}
+
+    monkeypatch.setattr(platform, "infer", counted)
+    monkeypatch.setattr(platform, "open_camera", lambda camera_id, source: asyncio.sleep(0, StillSource(20.0)))
+    monkeypatch.setattr(vision, "defect_score", lambda result, sensitivity: 0.9 if result["call"] <= failing_calls else 0.0)
+    async with running_engine(platform, camera_fps=[20.0]) as (engine, events):
+        monitor = next(iter(engine.monitors.values()))
+        await engine.handle({"cmd": "monitor.update", "id": monitor["id"], "patch": {"consecutive": 5}})
+        calls_at_alert: list[int] = []
+        engine.add_sink(lambda event: calls_at_alert.append(len(inferred)) if event.get("event") == "alert" else None)
+        await asyncio.sleep(1.5)
+        history = engine.history[monitor["id"]].buckets
+
+    if failing_calls == 1:
+        assert calls_at_alert == [], "one false positive was counted once per reused frame"
+    else:
+        assert calls_at_alert and calls_at_alert[0] >= 5, f"alert fired after {calls_at_alert} model calls"
+    assert sum(bucket["n"] for bucket in history) <= len(inferred), "reused frames were recorded as scores"
+
+
+async def test_still_view_drops_to_the_quiet_rate_until_it_changes(monkeypatch) -> None:
+    """A camera whose view stops changing is held at the floor rate, and the first change restores it."""
+
+    class PausableSource(FakeSource):
+        moving = False
+
+        def shade(self, seq: int) -> int:
+            return seq * 101 % 256 if self.moving else 128
+
+    source = PausableSource(20.0)
+    platform = FakePlatform(infer_s=0.02)
+    monkeypatch.setattr(platform, "open_camera", lambda camera_id, source_spec: asyncio.sleep(0, source))
+    async with running_engine(platform, camera_fps=[20.0]) as (engine, _):
+        await engine.handle({"cmd": "settings.update", "patch": {"frame_reuse_distance": 0, "quiet_period_s": 0.3}})
+        camera = engine.cameras.values()[0]
+        await asyncio.sleep(1.0)
+        quiet = camera.quiet, camera.target_fps, engine.scheduler.stats()
+        source.moving = True
+        await asyncio.sleep(2.2)
+        woken = camera.quiet, camera.target_fps
+
+    assert quiet[0] and quiet[1] <= scheduler.QUIET_FPS, f"still view not held back: {quiet[:2]}"
+    assert quiet[2]["quiet_cameras"] == 1 and quiet[2]["quiet_saved_fps"] > 10
+    assert not woken[0] and woken[1] > 10, f"change did not restore the rate: {woken}"
+
+
+async def test_frames_are_grabbed_while_the_model_runs(monkeypatch) -> None:
+    """A slow grab overlaps inference on another camera, so the worker is held only for the model call."""
+
+    class SlowSource(FakeSource):
+        async def grab(self, luma: bool = False):
+            await asyncio.sleep(0.03)
+            return await super().grab(luma)
+
+    platform = FakePlatform(infer_s=0.05)
+    monkeypatch.setattr(platform, "open_camera", lambda camera_id, source: asyncio.sleep(0, SlowSource(30.0)))
+    async with running_engine(platform, camera_fps=[30.0, 30.0, 30.0]) as (engine, _):
+        await asyncio.sleep(2.0)
+        served = sum(camera.achieved_fps for camera in engine.cameras.values())
+        infer_ms = engine.scheduler.infer_ms
+
+    assert served > 15.0, f"grabs did not overlap inference: {served:.1f} fps, sequential would be 12.5"
+    assert infer_ms < 65.0, f"latency should be the model's alone, got {infer_ms:.0f} ms"
+
+
+async def test_heavy_camera_is_charged_its_own_service_time(monkeypatch) -> None:
+    """Capacity is shared in processing time, so a camera slow to serve gets fewer frames, not more of the host."""
+
+    class HeavySource(FakeSource):
+        async def grab(self, luma: bool = False):
+            await asyncio.sleep(0.06)
+            return await super().grab(luma)
+
+    sources = iter([HeavySource(30.0), FakeSource(30.0)])
+    platform = FakePlatform(infer_s=0.02)
+    monkeypatch.setattr(platform, "open_camera", lambda camera_id, source: asyncio.sleep(0, next(sources)))
+    async with running_engine(platform, camera_fps=[30.0, 29.0]) as (engine, _):
+        await asyncio.sleep(2.0)
+        heavy, light = sorted(engine.cameras.values(), key=lambda camera: -camera.max_fps)
+        costs = heavy.service_ms, light.service_ms
+        targets = heavy.target_fps, light.target_fps
+
+    assert costs[0] > 2 * costs[1], f"service times not tracked per camera: {costs}"
+    assert targets[1] > 2 * targets[0], f"heavy camera not charged its cost: {targets}"
+
+
+async def test_power_profile_bounds_what_the_hub_takes() -> None:
+    """A profile halves the capacity handed out, caps each camera and coarsens history; a changed knob makes it custom."""
+    platform = FakePlatform(infer_s=0.02)
+    async with running_engine(platform, camera_fps=[30.0]) as (engine, events):
+        camera = next(iter(engine.cameras.values()))
+        await asyncio.sleep(0.8)
+        full = engine.scheduler.capacity_fps()
+        await engine.handle({"cmd": "settings.update", "patch": {"power_profile": "raspberry_pi"}})
+        budgeted = engine.scheduler.capacity_fps()
+        await asyncio.sleep(0.5)
+        history = next(iter(engine.history.values()))
+        applied = engine.settings["power_profile"], engine.settings["inference_budget"], camera.target_fps, history.bucket_s
+        await engine.handle({"cmd": "settings.update", "patch": {"inference_budget": 0.75}})
+        custom = engine.settings["power_profile"]
+        await engine.handle({"cmd": "settings.update", "patch": {"power_profile": "turbo"}, "req_id": 3})
+
+    assert abs(budgeted - full / 2) < 0.2 * full, f"budget not applied to capacity: {full} -> {budgeted}"
+    assert applied == ("raspberry_pi", 0.5, 2.0, 300), f"profile not applied: {applied}"
+    assert custom == "custom"
+    assert any(e["event"] == "error" and e.get("req_id") == 3 and "power profile" in e["message"] for e in events)
+
+
+async def test_batch_window_reaches_scheduler_and_platform_from_start_and_edits() -> None:
+    """One setting sets how long the scheduler groups due cameras and how long the runtime waits to stack them."""
+    platform = FakePlatform()
+    async with running_engine(platform, camera_fps=[]) as (engine, events):
+        started = engine.scheduler.batch_window_s, platform.batch_window_s
+        await engine.handle({"cmd": "settings.update", "patch": {"batch_window_ms": 25}})
+        edited = engine.scheduler.batch_window_s, platform.batch_window_s
+        await engine.handle({"cmd": "settings.update", "patch": {"batch_window_ms": 500}, "req_id": 4})
+
+    async with running_engine(platform, camera_fps=[]) as (engine, _):
+        restarted = engine.scheduler.batch_window_s
+
+    assert started == (0.01, 0.01)
+    assert edited == (0.025, 0.025)
+    assert restarted == 0.025
+    assert any(e["event"] == "error" and e.get("req_id") == 4 and "batch window" in e["message"] for e in events)
+
+
+async def test_concurrency_follows_platform_workers_live(monkeypatch) -> None:
+    """A worker pool that grows or shrinks is followed on the next dispatch, without a restart."""
+    platform = FakePlatform(infer_s=0.05)
+    active, peaks = [0], [0]
+    infer = platform.infer
+
+    async def tracked(rgb, plan=None):
+        active[0] += 1
+        peaks[-1] = max(peaks[-1], active[0])
+        try:
+            return await infer(rgb, plan)
+        finally:
+            active[0] -= 1
+
+    monkeypatch.setattr(platform, "infer", tracked)
+    async with running_engine(platform, camera_fps=[30.0, 30.0, 30.0]):
+        for workers in (1, 3, 1):
+            platform.workers = workers
+            await asyncio.sleep(0.2)
+            peaks.append(0)
+            await asyncio.sleep(0.6)
+            peaks.append(0)
+
+    assert peaks[1::2] == [1, 3, 1]
+
+
+async def test_dispatch_sleeps_until_a_deadline_or_a_change() -> None:
+    """An idle loop wakes only to re-read its cameras, a new camera is dispatched at once, and 60 are all served."""
+    platform = FakePlatform(infer_s=0.01)
+    platform.workers = 4
+    async with running_engine(platform, camera_fps=[]) as (engine, _):
+        passes = [0]
+        pop_due = engine.scheduler._pop_due
+
+        def counted(now):
+            passes[0] += 1
+            return pop_due(now)
+
+        engine.scheduler._pop_due = counted
+        await asyncio.sleep(1.0)
+        idle_passes = passes[0]
+        seen: dict[str, int] = {}
+        original = engine.scheduler._on_result
+
+        async def spy(camera, frame, result):
+            seen[camera.id] = seen.get(camera.id, 0) + 1
+            await original(camera, frame, result)
+
+        engine.scheduler._on_result = spy
+        for index in range(60):
+            await engine.handle({"cmd": "camera.add", "name": f"cam{index}", "source": {"kind": "fake", "fps": 2.0}})
+        for camera in engine.cameras.values():
+            await engine.handle({"cmd": "monitor.add", "monitor": {"name": f"m-{camera.name}", "camera_id": camera.id}})
+        await asyncio.sleep(1.6)
+
+    assert idle_passes <= 3, f"idle dispatch loop woke {idle_passes} times in a second"
+    assert len(seen) == 60 and min(seen.values()) >= 2, f"cameras starved: {sorted(seen.values())[:5]}"
+
+
+async def test_idle_hub_parks_its_background_loops() -> None:
+    """With nothing monitored and nobody listening no loop wakes, and a subscriber or a printer stirs them."""
+    platform = FakePlatform()
+    engine = Engine(platform)
+    await engine.start()
+    try:
+        await engine.handle({"cmd": "camera.add", "name": "idle", "source": {"kind": "fake", "fps": 10.0}})
+        await asyncio.sleep(0.1)
+        snapshots, passes = [0], [0]
+        state_event, pop_due = engine.state_event, engine.scheduler._pop_due
+
+        def counted_state():
+            snapshots[0] += 1
+            return state_event()
+
+        def counted_pass(now):
+            passes[0] += 1
+            return pop_due(now)
+
+        engine.state_event, engine.scheduler._pop_due = counted_state, counted_pass
+        await asyncio.sleep(1.5)
+        idle = snapshots[0], passes[0], len(platform.http_calls)
+        await _register_printer(engine)
+        await asyncio.sleep(0.1)
+        polled = len(platform.http_calls)
+        events: list[dict] = []
+        engine.add_sink(events.append)
+        await asyncio.sleep(1.2)
+    finally:
+        await engine.stop()
+
+    assert idle == (0, 0, 0), f"idle hub woke: {idle}"
+    assert polled > 0, "a new printer was not polled"
+    assert sum(event["event"] == "state" for event in events) >= 2, "a subscriber did not restart the ticker"
+
+
+async def test_inference_mode_follows_camera_count() -> None:
+    """Automatic mode wants latency for a lone camera and throughput for more; a pinned mode holds.
+
+    A reconfigured runtime is told the mode again, since it starts from its default.
+    """
+    platform = FakePlatform(infer_s=0.01)
+    async with running_engine(platform, camera_fps=[10.0]) as (engine, events):
+        await asyncio.sleep(0.05)
+        await engine.handle({"cmd": "camera.add", "name": "second", "source": {"kind": "fake", "fps": 10.0}})
+        camera = next(camera for camera in engine.cameras.values() if camera.name == "second")
+        await engine.handle({"cmd": "monitor.add", "monitor": {"name": "m-second", "camera_id": camera.id}})
+        await asyncio.sleep(0.05)
+        await engine.handle({"cmd": "settings.update", "patch": {"inference_mode": "latency"}})
+        await asyncio.sleep(0.05)
+        await engine.handle({"cmd": "model.reload"})
+        await asyncio.sleep(0.05)
+        stats = engine.scheduler.stats()
+        await engine.handle({"cmd": "settings.update", "patch": {"inference_mode": "fastest"}, "req_id": 1})
+
+    assert any(event["event"] == "error" and event.get("req_id") == 1 for event in events)
+    assert engine.settings["inference_mode"] == "latency"
+    assert platform.inference_modes == ["latency", "throughput", "latency", "latency"]
+    assert stats["inference_mode"] == "latency"
+
+
+async def test_on_demand_frames_queue_behind_live_monitoring(monkeypatch) -> None:
+    """Classify waits for a worker no camera needs, in lane order, and is turned away rather than starving cameras.
+
+    The on-demand lanes never hold more than their share of the workers, and a
+    full queue or a wait with cameras always due is rejected and counted.
+    """
+    monkeypatch.setattr(scheduler, "LANE_QUEUE_LIMIT", 4)
+    monkeypatch.setattr(scheduler, "LANE_WAIT_S", 0.3)
+    platform = FakePlatform(infer_s=0.05)
+    platform.workers = 4
+    active, peak, finished = [0], [0], []
+    infer = platform.infer
+
+    async def tracked(rgb, plan=None):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        try:
+            return await infer(rgb, plan)
+        finally:
+            active[0] -= 1
+
+    monkeypatch.setattr(platform, "infer", tracked)
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+
+    async def submit(lane: str, name: str) -> None:
+        await engine.scheduler.infer(frame, lane=lane)
+        finished.append(name)
+
+    async with running_engine(platform, camera_fps=[]) as (engine, _):
+        await engine.handle({"cmd": "settings.update", "patch": {"on_demand_share": 0.5}})
+        outcomes = await asyncio.gather(
+            submit("background", "background"),
+            *(submit("user", f"user{index}") for index in range(5)),
+            return_exceptions=True,
+        )
+        idle_stats = engine.scheduler.stats()
+        platform.workers = 1
+        await engine.handle({"cmd": "camera.add", "name": "busy", "source": {"kind": "fake", "fps": 30.0}})
+        camera = next(iter(engine.cameras.values()))
+        await engine.handle({"cmd": "monitor.add", "monitor": {"name": "m-busy", "camera_id": camera.id}})
+        await asyncio.sleep(0.1)
+        with pytest.raises(scheduler.InferenceBusy):
+            await engine.classify(b"\xff\xd8jpeg")
+        busy_stats = engine.scheduler.stats()
+
+    assert [type(outcome) for outcome in outcomes].count(scheduler.InferenceBusy) == 1
+    assert finished[-1] == "background" and len(finished) == 5
+    assert peak[0] == 2
+    assert idle_stats["rejected"] == {"user": 1, "background": 0}
+    assert busy_stats["rejected"]["user"] == 2 and busy_stats["queued"] == {"user": 0, "background": 0}
+
+
 async def test_defect_pipeline() -> None:
     platform = FakePlatform(infer_s=0.02, failing=True)
     async with running_engine(platform, camera_fps=[10.0]) as (engine, events):
@@ -455,6 +850,36 @@ async def test_state_persists_across_restart() -> None:
         await reborn.stop()
 
 
+@pytest.mark.parametrize("command", [{"cmd": "settings.update", "patch": {"inference_runtime": "onnx"}}, {"cmd": "model.reload"}])
+async def test_runtime_switch_keeps_monitoring(monkeypatch, command: dict) -> None:
+    """A runtime change or model reload builds its replacement while frames keep being inferred."""
+    platform = FakePlatform(infer_s=0.02)
+    inferred: list[float] = []
+    configured: list[str] = []
+    infer, configure = platform.infer, platform.configure
+
+    async def counted(rgb, plan=None):
+        inferred.append(time.monotonic())
+        return await infer(rgb, plan)
+
+    async def slow(settings):
+        await asyncio.sleep(0.5)
+        await configure(settings)
+        configured.append(settings["inference_runtime"])
+
+    monkeypatch.setattr(platform, "infer", counted)
+    async with running_engine(platform, camera_fps=[20.0]) as (engine, _):
+        monkeypatch.setattr(platform, "configure", slow)
+        await asyncio.sleep(0.3)
+        started = time.monotonic()
+        await engine.handle(command)
+        finished = time.monotonic()
+
+    assert finished - started >= 0.5
+    assert configured == [command.get("patch", {}).get("inference_runtime", "auto")]
+    assert sum(started < at < finished for at in inferred) >= 5, "monitoring paused for the switch"
+
+
 def test_rotate_frame_and_transform_compose() -> None:
     frame = np.zeros((48, 64, 3), dtype=np.uint8)
     frame[0, 0] = (255, 0, 0)
@@ -471,6 +896,44 @@ def test_rotate_frame_and_transform_compose() -> None:
     assert cropped.shape == (64, 24, 3), "crop is applied on the rotated frame"
 
 
+@pytest.mark.parametrize("rotation", [0, 90, 180, 270])
+def test_compiled_plan_matches_transforming_the_full_frame(rotation: int) -> None:
+    """A compiled plan feeds the model exactly what transform() then preprocess() would."""
+    assets = vision.Assets(mean=(0.5, 0.4, 0.3), std=(0.2, 0.25, 0.3), prototypes={})
+    frame = np.random.default_rng(rotation).integers(0, 256, (300, 520, 3), dtype=np.uint8)
+    pipeline = {"rotation": rotation, "crop": {"x": 0.1, "y": 0.2, "w": 0.6, "h": 0.7}, "brightness": 1.2, "contrast": 0.8, "sharpness": 1.5}
+
+    expected = vision.preprocess(vision.transform(frame, **pipeline), assets)
+    planned = vision.preprocess(frame, assets, vision.compile_plan(frame.shape, **pipeline))
+
+    assert np.array_equal(planned, expected)
+
+
+def test_luminance_plane_reads_like_its_grey_rgb_frame() -> None:
+    """A grey RGB frame and its luminance plane, at either level range, feed the model the same input."""
+    assets = vision.Assets(mean=(0.5, 0.4, 0.3), std=(0.2, 0.25, 0.3), prototypes={})
+    luma = np.random.default_rng(0).integers(0, 256, (120, 160), dtype=np.uint8)
+    video_levels = np.round(vision.VIDEO_BLACK + luma * (vision.VIDEO_WHITE - vision.VIDEO_BLACK) / 255.0).astype(np.uint8)
+
+    expected = vision.preprocess(np.repeat(luma[..., None], 3, axis=2), assets)
+    full = vision.preprocess(luma, assets)
+    limited = vision.preprocess(video_levels, assets, vision.compile_plan(luma.shape, limited=True))
+
+    assert np.allclose(full, expected, atol=1e-3)
+    assert np.allclose(limited, expected, atol=0.02)
+
+
+async def test_camera_update_recompiles_the_preprocessing_plan() -> None:
+    platform = FakePlatform()
+    async with running_engine(platform, camera_fps=[10.0]) as (engine, _):
+        camera = engine.cameras.values()[0]
+        plan = camera.preprocess_plan((48, 64, 3))
+        assert camera.preprocess_plan((48, 64, 3)) is plan, "an unchanged camera reuses its plan"
+        await engine.handle({"cmd": "camera.update", "id": camera.id, "patch": {"rotation": 90}})
+        assert camera.preprocess_plan((48, 64, 3)).rotation == 90
+        assert camera.preprocess_plan((96, 128, 3)).shape == (96, 128), "a new frame size recompiles"
+
+
 async def test_camera_rotation_persists_and_rejects_off_axis() -> None:
     platform = FakePlatform()
     async with running_engine(platform, camera_fps=[10.0]) as (engine, _):
@@ -512,6 +975,23 @@ async def test_history_buckets_and_alert_snapshots() -> None:
     assert base64.b64decode(snapshot["jpeg"]) == b"\xff\xd8fake", "snapshot bytes did not round-trip over the protocol"
 
 
+def test_history_resolution_changes_mid_bucket_keep_buckets_in_order() -> None:
+    """The open bucket keeps its width; the next ends on the new width's boundary, coarser or finer."""
+    history = MonitorHistory(60)
+    history.record(130.0, 0.1, 0.5)
+    history.bucket_s = 300
+    history.record(170.0, 0.2, 0.5)
+    history.record(190.0, 0.3, 0.5)
+    history.record(310.0, 0.4, 0.5)
+    history.bucket_s = 60
+    history.record(400.0, 0.5, 0.5)
+    history.record(610.0, 0.6, 0.5)
+
+    spans = [(b["t"], b["t"] + b["s"], b["n"]) for b in history.buckets]
+    assert spans == [(120, 180, 2), (180, 300, 1), (300, 600, 2), (600, 660, 1)]
+    assert history.series()["stats"]["watch_min"] == 1 + 2 + 5 + 1
+
+
 async def test_result_events_are_bounded_without_losing_history() -> None:
     platform = FakePlatform(infer_s=0.01)
     async with running_engine(platform, camera_fps=[30.0]) as (engine, events):
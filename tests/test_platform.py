@@ -6,17 +6,19 @@ import asyncio
 import json
 import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
 import pytest
 
 from printguard.engine import vision
+from printguard.server import inference as inference_module
 from printguard.server.inference import Inference, _measure_concurrency, _register_library
 from printguard.server.platform import ServerPlatform
 
 
-@pytest.mark.parametrize("runtime", ["auto", "litert", "onnx"])
+@pytest.mark.parametrize("runtime", ["auto", "litert", "onnx", "process"])
 async def test_model_inference(tmp_path: Path, runtime: str) -> None:
     """Every selectable production model runtime loads and classifies."""
     platform = ServerPlatform(Path("models"), tmp_path, "http://localhost:9997", "rtsp://localhost:8554")
@@ -45,11 +47,11 @@ async def test_runtimes_agree_on_classification() -> None:
         json.loads((model_dir / "metadata.json").read_text()),
         json.loads((model_dir / "prototypes.json").read_text())["prototypes"],
     )
-    tensor = np.random.default_rng(0).random((1, 3, 224, 224), dtype=np.float32)
+    frame = np.random.default_rng(0).integers(0, 256, (240, 320, 3), dtype=np.uint8)
     embeddings = []
     for runtime in ("litert", "onnx"):
         inference = Inference(model_dir, runtime)
-        embeddings.append(await inference.run(tensor))
+        embeddings.append(await inference.run(frame, None, np.empty(inference.embedding_size, dtype=np.float32)))
         inference.close()
 
     classifications = [vision.classify(embedding, assets) for embedding in embeddings]
@@ -89,3 +91,527 @@ def test_measured_concurrency_tracks_scaling() -> None:
 
     assert _measure_concurrency(scales)[0] > 1
     assert _measure_concurrency(serialises)[0] == 1
+
+
+def test_measured_batch_follows_per_call_overhead() -> None:
+    """A model whose cost is per call, not per frame, is given the largest batch it takes."""
+
+    def per_call(tensor: np.ndarray) -> np.ndarray:
+        time.sleep(0.002)
+        return tensor
+
+    assert _measure_concurrency(per_call, max_batch=4).batch == 4
+    assert _measure_concurrency(per_call).batch == 1
+
+
+class FakeModel:
+    """Stands in for a runtime backend: a fixed per-call cost over any batch it is given."""
+
+    runtime = "onnx"
+    device = "test"
+    version = "1"
+    max_batch = 1
+    embedding_size = 4
+    intra_op = False
+    threads = 1
+    calls: list[int] = []
+
+    def __init__(self, model_path: Path) -> None:
+        self.model_path = model_path
+        self.precision = model_path.stem.removeprefix("encoder_")
+
+    def run(self, samples: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        self.calls.append(len(samples))
+        time.sleep(0.002)
+        if out is None:
+            out = np.empty((len(samples), self.embedding_size), dtype=np.float32)
+        out[:] = samples.reshape(len(samples), -1)[:, :4]
+        return out
+
+    def warm(self, batch: int, threads: int) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+async def test_concurrent_frames_share_one_batched_call(tmp_path: Path, monkeypatch) -> None:
+    """Frames arriving together are sampled into one model call and answered in order.
+
+    Each embedding is written into the array its caller supplied, and the stacked
+    samples reuse one buffer from call to call rather than allocating per batch.
+    """
+
+    class Batching(FakeModel):
+        max_batch = 4
+        calls: list[int] = []
+        buffers: list[int] = []
+
+        def run(self, samples: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+            self.buffers.append(samples.ctypes.data)
+            return super().run(samples, out)
+
+    monkeypatch.setattr(inference_module, "OnnxInference", Batching)
+    inference = Inference(tmp_path, "onnx")
+    Batching.calls.clear()
+    Batching.buffers.clear()
+    frames = [np.full((48, 64), index, dtype=np.uint8) for index in range(inference.batch)]
+    outs = [np.empty(inference.embedding_size, dtype=np.float32) for _ in frames]
+
+    embeddings = await asyncio.gather(*(inference.run(frame, None, out) for frame, out in zip(frames, outs)))
+    await asyncio.gather(*(inference.run(frame, None, out) for frame, out in zip(frames, outs)))
+    inference.close()
+
+    assert inference.batch == 4 and inference.slots == 4 * inference.workers
+    assert Batching.calls == [4, 4]
+    assert Batching.buffers[0] == Batching.buffers[1]
+    assert all(embedding is out for embedding, out in zip(embeddings, outs))
+    assert [float(embedding[0]) for embedding in embeddings] == [0.0, 1.0, 2.0, 3.0]
+
+
+async def test_dynamic_batch_export_is_preferred_and_batches(tmp_path: Path, monkeypatch) -> None:
+    """The fixed-batch encoder runs one frame per call; a dynamic-batch export beside it is loaded and stacks frames."""
+
+    class Exported(FakeModel):
+        calls: list[int] = []
+
+        def __init__(self, model_path: Path) -> None:
+            super().__init__(model_path)
+            self.precision = inference_module._precision(model_path)
+            self.max_batch = 4 if model_path.stem.endswith(inference_module.DYNAMIC_SUFFIX) else 1
+
+    monkeypatch.setattr(inference_module, "OnnxInference", Exported)
+    (tmp_path / "encoder_float32.onnx").write_bytes(b"fixed")
+    fixed = Inference(tmp_path, "onnx")
+    fixed.close()
+    (tmp_path / "encoder_float32_dynamic.onnx").write_bytes(b"dynamic")
+    inference = Inference(tmp_path, "onnx")
+    Exported.calls.clear()
+    frames = [np.full((48, 64), index, dtype=np.uint8) for index in range(inference.batch)]
+    outs = [np.empty(inference.embedding_size, dtype=np.float32) for _ in frames]
+
+    await asyncio.gather(*(inference.run(frame, None, out) for frame, out in zip(frames, outs)))
+    inference.close()
+
+    assert fixed.batch == 1
+    assert inference._selected.model_path.name == "encoder_float32_dynamic.onnx"
+    assert inference.precision == "float32" and inference.batch > 1
+    assert Exported.calls == [inference.batch]
+
+
+def test_benchmark_is_reused_until_the_model_changes(tmp_path: Path, monkeypatch) -> None:
+    """A restart on an unchanged host skips the benchmark; a different model file does not.
+
+    Revalidation keeps an entry the host still delivers and drops one it falls well
+    short of, so a host that changed in a way the fingerprint misses re-measures on
+    the next start rather than running on a stale worker count forever.
+    """
+
+    class Counted(FakeModel):
+        calls: list[int] = []
+
+    monkeypatch.setattr(inference_module, "OnnxInference", Counted)
+    (tmp_path / "encoder_float32.onnx").write_bytes(b"model")
+    benchmarks = tmp_path / "benchmarks.json"
+
+    first = Inference(tmp_path, "onnx", benchmarks)
+    measured_calls = len(Counted.calls)
+    second = Inference(tmp_path, "onnx", benchmarks)
+    reused_calls = len(Counted.calls) - measured_calls
+    second.revalidate()
+    kept = json.loads(benchmarks.read_text())
+    second.capacity_fps *= 100
+    second.revalidate()
+    dropped = json.loads(benchmarks.read_text())
+    (tmp_path / "encoder_float32.onnx").write_bytes(b"retrained")
+    third = Inference(tmp_path, "onnx", benchmarks)
+    for inference in (first, second, third):
+        inference.close()
+
+    assert not first.cached and measured_calls > 0
+    assert second.cached and reused_calls == 0
+    assert (second.workers, second.batch) == (first.workers, first.batch)
+    assert all("validated_at" in entry for entry in kept.values())
+    assert dropped == {}
+    assert not third.cached
+
+
+def test_benchmark_measured_during_a_swap_is_not_saved(tmp_path: Path, monkeypatch) -> None:
+    """A runtime built while another serves frames is measured under load, so the next idle start re-measures."""
+    monkeypatch.setattr(inference_module, "OnnxInference", FakeModel)
+    (tmp_path / "encoder_float32.onnx").write_bytes(b"model")
+    benchmarks = tmp_path / "benchmarks.json"
+
+    swapped = Inference(tmp_path, "onnx", benchmarks, contended=True)
+    saved_during_swap = benchmarks.exists()
+    restarted = Inference(tmp_path, "onnx", benchmarks)
+    for inference in (swapped, restarted):
+        inference.close()
+
+    assert not swapped.cached and not saved_during_swap
+    assert not restarted.cached and benchmarks.exists()
+
+
+@pytest.mark.parametrize("drift", [0.0, 1.0])
+def test_reduced_precision_encoder_must_agree_with_float32(tmp_path: Path, monkeypatch, drift: float) -> None:
+    """A quantized encoder competes only while it reaches the float32 verdicts on the calibration set."""
+
+    class Quantizable(FakeModel):
+        def run(self, samples: np.ndarray) -> np.ndarray:
+            embedding = samples.reshape(len(samples), -1)[:, :2] - 128.0
+            if self.precision == "int8":
+                embedding[:, 1] += drift * np.sign(embedding[:, 0])
+            return embedding
+
+    assets = vision.Assets(
+        mean=(0.0,), std=(1.0,), prototypes={"success": np.asarray([1.0, 0.0]), "failure": np.asarray([-1.0, 0.0])}
+    )
+    samples = [np.full((1, 224, 224), value, dtype=np.uint8) for value in (126, 127, 129, 130)]
+    monkeypatch.setattr(inference_module, "OnnxInference", Quantizable)
+    monkeypatch.setattr(inference_module, "_calibration_set", lambda model_dir: (samples, assets))
+    (tmp_path / "encoder_int8.onnx").write_bytes(b"int8")
+
+    precisions = [candidate.precision for candidate in inference_module._candidates(tmp_path, "onnx")]
+
+    assert precisions == (["float32", "int8"] if drift == 0.0 else ["float32"])
+
+
+@pytest.mark.parametrize("stage", ["load", "run"])
+def test_reduced_precision_encoder_that_fails_is_held_back(tmp_path: Path, monkeypatch, caplog, stage: str) -> None:
+    """A variant that cannot be loaded or run on the calibration set is logged and left out, not fatal."""
+
+    class Broken(FakeModel):
+        def __init__(self, model_path: Path) -> None:
+            super().__init__(model_path)
+            if stage == "load" and self.precision == "int8":
+                raise ValueError("unsupported input")
+
+        def run(self, samples: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+            if self.precision == "int8":
+                raise TypeError("cannot cast float32 to uint8")
+            return super().run(samples, out)
+
+    assets = vision.Assets(mean=(0.0,), std=(1.0,), prototypes={"success": np.ones(4), "failure": -np.ones(4)})
+    samples = [np.full((1, 224, 224), 128, dtype=np.uint8)]
+    monkeypatch.setattr(inference_module, "OnnxInference", Broken)
+    monkeypatch.setattr(inference_module, "_calibration_set", lambda model_dir: (samples, assets))
+    (tmp_path / "encoder_int8.onnx").write_bytes(b"int8")
+
+    precisions = [candidate.precision for candidate in inference_module._candidates(tmp_path, "onnx")]
+
+    assert precisions == ["float32"]
+    assert "int8 encoder held back" in caplog.text
+
+
+def test_quantized_input_is_filled_in_its_own_scale() -> None:
+    """An integer NCHW input gets the normalised tensor quantized by the input's scale and zero point."""
+    assets = vision.Assets(mean=(0.485, 0.456, 0.406), std=(0.229, 0.224, 0.225), prototypes={})
+    samples = np.random.default_rng(0).integers(0, 256, (2, 224, 224), dtype=np.uint8)
+    scale, zero_point = 0.0187, 114
+    levels = inference_module._quantized_levels(assets, scale, zero_point, np.uint8)
+
+    kind = inference_module._input_kind((2, 3, 224, 224), np.uint8)
+    tensor = inference_module._fill(kind, samples, assets, np.empty((2, 3, 224, 224), dtype=np.uint8), levels)
+
+    expected = np.clip(np.rint(vision.normalise(samples, assets) / scale + zero_point), 0, 255)
+    assert kind == "quantized"
+    assert np.array_equal(tensor, expected.astype(np.uint8))
+
+
+def test_quantized_litert_output_is_dequantized(tmp_path: Path, monkeypatch) -> None:
+    """An INT8 encoder's embedding comes back in float units, not the integer levels of its output tensor."""
+    quantized_output = np.asarray([[-128, -28, 0, 127]], dtype=np.int8)
+
+    class QuantizedInterpreter:
+        def __init__(self, model_path: str, num_threads: int) -> None:
+            self._input = np.zeros((1, 3, 224, 224), dtype=np.int8)
+            self._output = np.zeros((1, 4), dtype=np.int8)
+
+        def get_input_details(self) -> list[dict]:
+            shape = np.asarray([1, 3, 224, 224])
+            return [{"index": 0, "shape": shape, "shape_signature": shape, "dtype": np.int8, "quantization": (0.02, -14)}]
+
+        def get_output_details(self) -> list[dict]:
+            return [{"index": 1, "shape": np.asarray([1, 4]), "dtype": np.int8, "quantization": (0.5, -28)}]
+
+        def allocate_tensors(self) -> None:
+            pass
+
+        def tensor(self, index: int):
+            return lambda: self._input if index == 0 else self._output
+
+        def invoke(self) -> None:
+            self._output[:] = quantized_output
+
+    assets = vision.Assets(mean=(0.5, 0.5, 0.5), std=(0.25, 0.25, 0.25), prototypes={})
+    monkeypatch.setattr(inference_module, "Interpreter", QuantizedInterpreter)
+    monkeypatch.setattr(inference_module, "_load_assets", lambda model_dir: assets)
+
+    model = inference_module.LiteRtInference(tmp_path / "encoder_int8.tflite")
+    embedding = model.run(np.full((1, 224, 224), 128, dtype=np.uint8))
+
+    assert model.input_kind == "quantized"
+    assert embedding.dtype == np.float32
+    assert np.allclose(embedding, 0.5 * (quantized_output.astype(np.float32) + 28))
+
+
+def test_multi_threaded_litert_interpreter_is_shared(tmp_path: Path, monkeypatch) -> None:
+    """Latency mode builds one multi-threaded interpreter for all workers; single-threaded ones stay per thread."""
+    built: list[int] = []
+
+    class CountingInterpreter:
+        def __init__(self, model_path: str, num_threads: int) -> None:
+            built.append(num_threads)
+            self._input = np.zeros((1, 3, 224, 224), dtype=np.float32)
+            self._output = np.zeros((1, 4), dtype=np.float32)
+
+        def get_input_details(self) -> list[dict]:
+            shape = np.asarray([1, 3, 224, 224])
+            return [{"index": 0, "shape": shape, "shape_signature": shape, "dtype": np.float32, "quantization": (0.0, 0)}]
+
+        def get_output_details(self) -> list[dict]:
+            return [{"index": 1, "shape": np.asarray([1, 4]), "dtype": np.float32, "quantization": (0.0, 0)}]
+
+        def allocate_tensors(self) -> None:
+            pass
+
+        def tensor(self, index: int):
+            return lambda: self._input if index == 0 else self._output
+
+        def invoke(self) -> None:
+            pass
+
+    assets = vision.Assets(mean=(0.5, 0.5, 0.5), std=(0.25, 0.25, 0.25), prototypes={})
+    monkeypatch.setattr(inference_module, "Interpreter", CountingInterpreter)
+    monkeypatch.setattr(inference_module, "_load_assets", lambda model_dir: assets)
+    model = inference_module.LiteRtInference(tmp_path / "encoder.tflite")
+    built.clear()
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        list(pool.map(lambda threads: model.warm(1, threads), [3, 3, 3, 1, 1, 1]))
+
+    assert built.count(3) == 1
+    assert 1 <= built.count(1) <= 3
+
+
+def test_workers_follow_cpu_quota_and_throttling(tmp_path: Path, monkeypatch) -> None:
+    """The worker limit moves live with the cgroup: up while saturated, down under pressure.
+
+    Idle workers are not grown into, and a quota cut below the current count
+    clamps to it in one step rather than one worker at a time.
+    """
+    throttling = [(100, 0)]
+    monkeypatch.setattr(inference_module, "OnnxInference", FakeModel)
+    monkeypatch.setattr(inference_module, "_cpu_limit", lambda: 3.0)
+    monkeypatch.setattr(inference_module, "_cpu_throttling", lambda: throttling[-1])
+    inference = Inference(tmp_path, "onnx")
+    inference.workers = inference.slots = 1
+    inference.call_ms = inference._baseline_ms
+    inference._peak = 1
+
+    steps = []
+    for throttled in (None, None, (200, 50), (300, 50)):
+        if throttled:
+            throttling.append(throttled)
+        steps.append((inference.rebalance(), inference.workers))
+    inference.workers = 8
+    steps.append((inference.rebalance(), inference.workers))
+    inference.close()
+
+    assert steps == [(True, 2), (False, 2), (True, 1), (False, 1), (True, 3)]
+    assert inference.slots == 3 * inference.batch
+
+
+def test_process_pool_follows_quota_starts_on_use_and_closes_off_the_caller(tmp_path: Path, monkeypatch) -> None:
+    """The pool is sized by the CPU quota, spawns nothing until a frame needs it, and close() does not wait for it."""
+    stopping = threading.Event()
+    pools: list[dict] = []
+
+    class Pool:
+        def __init__(self, max_workers: int, **kwargs) -> None:
+            pools.append({"workers": max_workers, "stopped": False})
+
+        def submit(self, fn, *args):
+            future = Future()
+            future.set_result(None)
+            return future
+
+        def shutdown(self, wait: bool, cancel_futures: bool) -> None:
+            stopping.wait(5.0)
+            pools[-1]["stopped"] = True
+
+    class Probe:
+        max_batch = 1
+        embedding_size = 4
+
+        def __init__(self, model_path: Path) -> None:
+            pass
+
+    monkeypatch.setattr(inference_module, "LiteRtInference", Probe)
+    monkeypatch.setattr(inference_module, "ProcessPoolExecutor", Pool)
+    monkeypatch.setattr(inference_module, "_cpu_limit", lambda: 2.5)
+
+    model = inference_module.ProcessInference(tmp_path / "encoder_float32.tflite")
+    spawned_on_construction = list(pools)
+    model.run(np.zeros((1, 224, 224), dtype=np.uint8))
+    model.close()
+    stopped_when_close_returned = pools[-1]["stopped"]
+    stopping.set()
+
+    assert spawned_on_construction == []
+    assert [pool["workers"] for pool in pools] == [2]
+    assert not stopped_when_close_returned
+
+
+def test_latency_mode_runs_one_frame_across_measured_threads(tmp_path: Path, monkeypatch) -> None:
+    """Latency mode serves one unbatched frame at a time on the thread count that answered soonest.
+
+    Throughput mode comes back with the workers and batch it had, and only it is rebalanced.
+    """
+
+    class Threaded(FakeModel):
+        max_batch = 4
+        intra_op = True
+        calls: list[int] = []
+
+        def threaded(self, threads: int):
+            return lambda samples: time.sleep(0.008 / min(threads, 2))
+
+    monkeypatch.setattr(inference_module, "OnnxInference", Threaded)
+    monkeypatch.setattr(inference_module.os, "cpu_count", lambda: 4)
+    inference = Inference(tmp_path, "onnx")
+    throughput = (inference.workers, inference.batch)
+
+    switched = inference.set_mode("latency")
+    latency = (inference.workers, inference.batch, inference.slots, inference._selected.threads)
+    repeated = inference.set_mode("latency")
+    rebalanced = inference.rebalance()
+    inference.set_mode("throughput")
+    inference.close()
+
+    assert inference.threads == 2
+    assert switched and not repeated and not rebalanced
+    assert latency == (1, 1, 1, 2)
+    assert (inference.workers, inference.batch, inference._selected.threads) == (*throughput, 1)
+
+
+async def test_retired_runtime_closes_after_its_last_frame(tmp_path: Path, monkeypatch) -> None:
+    """A runtime swapped out mid-frame answers that frame before its workers are released."""
+
+    class Closing(FakeModel):
+        closed = False
+
+        def close(self) -> None:
+            self.closed = True
+
+    monkeypatch.setattr(inference_module, "OnnxInference", Closing)
+    inference = Inference(tmp_path, "onnx")
+    out = np.empty(inference.embedding_size, dtype=np.float32)
+
+    with inference.serving():
+        inference.retire()
+        open_while_serving = not inference._selected.closed
+        embedding = await inference.run(np.ones((48, 64), dtype=np.uint8), None, out)
+
+    assert open_while_serving and embedding is out
+    assert inference._selected.closed
+
+
+def _conv_encoder(model_dir: Path) -> None:
+    """Writes a small float32 ONNX encoder that opens with a padded convolution, with real assets beside it."""
+    onnx = pytest.importorskip("onnx")
+    from onnx import helper, numpy_helper
+
+    rng = np.random.default_rng(0)
+    for name in ("metadata.json", "prototypes.json"):
+        (model_dir / name).write_text((Path("models") / name).read_text())
+    initializers = [
+        numpy_helper.from_array(rng.normal(size=(8, 3, 3, 3)).astype(np.float32), "weights"),
+        numpy_helper.from_array(rng.normal(size=(8, 1024)).astype(np.float32), "projection"),
+    ]
+    nodes = [
+        helper.make_node("Conv", ["frames", "weights"], ["features"], strides=[2, 2], pads=[1, 1, 1, 1]),
+        helper.make_node("Relu", ["features"], ["active"]),
+        helper.make_node("GlobalAveragePool", ["active"], ["pooled"]),
+        helper.make_node("Flatten", ["pooled"], ["flat"]),
+        helper.make_node("MatMul", ["flat", "projection"], ["embeddings"]),
+    ]
+    graph = helper.make_graph(
+        nodes,
+        "encoder",
+        [helper.make_tensor_value_info("frames", onnx.TensorProto.FLOAT, ["batch", 3, 224, 224])],
+        [helper.make_tensor_value_info("embeddings", onnx.TensorProto.FLOAT, ["batch", 1024])],
+        initializers,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)], ir_version=8)
+    onnx.save(model, str(model_dir / "encoder_float32.onnx"))
+
+
+def test_folded_encoder_matches_and_replaces_the_original(tmp_path: Path) -> None:
+    """Folding the channels changes the work, not the embedding, and the hub loads the folded copy.
+
+    The convolution is padded so the border outputs, where padding drops some of
+    the mean's terms, are held to the same agreement as the interior.
+    """
+    _conv_encoder(tmp_path)
+    from printguard.server.fold_channels import main as fold
+
+    rng = np.random.default_rng(0)
+    fold([str(tmp_path)])
+    original = inference_module.OnnxInference(tmp_path / "encoder_float32.onnx")
+    inference = Inference(tmp_path, "onnx")
+    samples = rng.integers(0, 256, (2, 224, 224), dtype=np.uint8)
+    expected, actual = original.run(samples), inference._selected.run(samples)
+    original.close()
+    inference.close()
+
+    assert inference._selected.model_path.name == "encoder_float32_mono.onnx"
+    assert inference._selected.input_kind == "grey" and original.input_kind == "normalised"
+    np.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-4 * float(np.abs(expected).max()))
+
+
+def test_every_pool_thread_is_warmed_before_serving(tmp_path: Path, monkeypatch) -> None:
+    """Each inference thread readies its runtime state once, including threads rebalancing may grow into.
+
+    Only one of them builds the multi-threaded model latency mode runs, since
+    latency mode runs one frame at a time and shares it.
+    """
+
+    class Warmed(FakeModel):
+        warmed: list[tuple[int, int, int]] = []
+
+        def warm(self, batch: int, threads: int) -> None:
+            self.warmed.append((threading.get_ident(), batch, threads))
+
+    monkeypatch.setattr(inference_module, "OnnxInference", Warmed)
+    monkeypatch.setattr(inference_module.os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(inference_module, "_measure_concurrency", lambda *args: inference_module.Measurement(2, 100.0, 1, 3))
+    inference = Inference(tmp_path, "onnx")
+    inference.close()
+
+    assert len({ident for ident, _, _ in Warmed.warmed}) == len(Warmed.warmed) == 4
+    assert sorted(threads for _, _, threads in Warmed.warmed) == [1, 1, 1, inference.threads]
+    assert inference.threads == 3
+    assert {batch for _, batch, _ in Warmed.warmed} == {inference.batch}
+
+
+def test_optimised_graph_is_saved_and_reused(tmp_path: Path) -> None:
+    """The graph ORT optimised on one start is loaded on the next, and a damaged copy is rebuilt."""
+    _conv_encoder(tmp_path)
+    graphs = tmp_path / "graphs"
+    samples = np.random.default_rng(0).integers(0, 256, (2, 224, 224), dtype=np.uint8)
+
+    embeddings = []
+    for damage in (False, False, True):
+        saved = list(graphs.glob("*.onnx"))
+        if damage:
+            saved[0].write_bytes(b"truncated")
+        model = inference_module.OnnxInference(tmp_path / "encoder_float32.onnx", graphs)
+        embeddings.append(model.run(samples))
+        model.close()
+
+    saved = list(graphs.glob("*"))
+    assert len(saved) == 1 and saved[0].name.startswith("encoder_float32-")
+    assert saved[0].stat().st_size > len(b"truncated")
+    np.testing.assert_allclose(embeddings[1], embeddings[0], rtol=1e-5)
+    np.testing.assert_allclose(embeddings[2], embeddings[0], rtol=1e-5)
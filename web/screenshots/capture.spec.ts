@@ -16,7 +16,7 @@ const series = (fn: (i: number) => number, n = 48): ScorePoint[] =>
 
 const camera = (id: string, name: string, source: Camera["source"], inferring = false): Camera => ({
   id, name, source, printer_id: null, max_fps: 30, brightness: 1, contrast: 1, sharpness: 0,
-  crop: null, rotation: 0, target_fps: 30, achieved_fps: 29.8, inferring, in_use: true, online: true, last_result: null,
+  crop: null, rotation: 0, target_fps: 30, achieved_fps: 29.8, risk: 0, quiet: false, service_ms: 18, min_fps: 0, inferring, in_use: true, online: true, last_result: null,
 });
 
 const printer = (id: string, name: string, provider: string, status: string, progress: number, job: string): Printer => ({
@@ -25,7 +25,7 @@ const printer = (id: string, name: string, provider: string, status: string, pro
 
 const monitor = (id: string, name: string, camera_id: string, printer_id: string, alerting = false): Monitor => ({
   id, name, camera_id, printer_id, enabled: true, threshold: 0.6, sensitivity: 0.5, consecutive: 3,
-  notify: true, on_defect: "pause", cooldown_s: 90, watching: true,
+  notify: true, on_defect: "pause", cooldown_s: 90, detect_within_s: 0, watching: true,
   alert: alerting ? { score: 0.86, action: "pause", ts: NOW } : null,
 });
 
@@ -53,7 +53,7 @@ function engine(): EngineState {
       monitor("m3", "Bambu X1C", "c3", ""),
     ],
     settings: { notifiers: {}, update_check: true, theme: "dark", themes: [], layout: {} },
-    tokens: [], stats: { inference_device: "CPU", infer_ms: 18, capacity_fps: 1783 }, integrations: [], notifiers: [],
+    tokens: [], stats: { inference_device: "CPU", inference_mode: "throughput", infer_ms: 18, capacity_fps: 1783, reuse_rate: 0, reused_fps: 0, quiet_cameras: 0, quiet_saved_fps: 0, queued: { user: 0, background: 0 }, rejected: { user: 0, background: 0 } }, integrations: [], notifiers: [],
   };
 }
 
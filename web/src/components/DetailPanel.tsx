@@ -191,6 +191,16 @@ export function DetailPanel({ monitor }: { monitor: Monitor }) {
               hint="Flagged frames in a row before it acts. Raise to ride out brief blips; lower to react faster."
               onChange={(v) => updateMonitor(monitor.id, { consecutive: v })}
             />
+            <Slider
+              label="Detect within (seconds)"
+              value={monitor.detect_within_s}
+              min={0}
+              max={120}
+              step={1}
+              format={(v) => (v ? String(v) : "Off")}
+              hint="Deadline for the consecutive detections, which reserves the rate they need on this camera. You are warned if the hub cannot keep it. 0 turns it off."
+              onChange={(v) => updateMonitor(monitor.id, { detect_within_s: v })}
+            />
           </div>
         </Section>
 
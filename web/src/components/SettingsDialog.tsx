@@ -41,6 +41,13 @@ export function SettingsDialog() {
   } = useStore();
   const [notifiers, setNotifiers] = useState(engine?.settings.notifiers ?? {});
   const updateCheck = engine?.settings.update_check ?? true;
+  const batchWindow = engine?.settings.batch_window_ms ?? 10;
+  const reuseDistance = engine?.settings.frame_reuse_distance ?? 4;
+  const onDemandShare = engine?.settings.on_demand_share ?? 0.25;
+  const quietPeriod = engine?.settings.quiet_period_s ?? 60;
+  const budget = engine?.settings.inference_budget ?? 1;
+  const cameraCap = engine?.settings.max_camera_fps ?? 0;
+  const stateInterval = engine?.settings.state_interval_s ?? 1;
   const [mqtt, setMqtt] = useState<MqttConfig>(engine?.settings.mqtt ?? {});
   const setMqttField = (key: keyof MqttConfig, value: MqttConfig[keyof MqttConfig]) => setMqtt({ ...mqtt, [key]: value });
   const [tokenName, setTokenName] = useState("");
@@ -477,15 +484,225 @@ export function SettingsDialog() {
               <option value="auto">Automatic</option>
               <option value="litert">LiteRT</option>
               <option value="onnx">ONNX Runtime</option>
+              <option value="process">LiteRT, one process per core</option>
             </select>
             <span className="block text-[0.7rem] leading-relaxed text-text-2">
               Automatic benchmarks both models and uses the higher-throughput runtime. ONNX Runtime can use Core ML,
-              Windows ML, OpenVINO or NVIDIA hardware; LiteRT uses its optimised CPU runtime for this model.
+              Windows ML, OpenVINO or NVIDIA hardware; LiteRT uses its optimised CPU runtime for this model, and can run
+              it in separate processes to scale across many cores.
             </span>
             <div className="flex items-center justify-between gap-3 rounded border border-line-0 px-3 py-2">
               <span className="text-xs text-text-1">Active compute</span>
               <span className="chip">{engine?.stats.inference_device ?? "initialising"}</span>
             </div>
+            <label className="label block" htmlFor="inference-mode">
+              Inference mode
+            </label>
+            <select
+              id="inference-mode"
+              className="field w-full"
+              value={engine?.settings.inference_mode ?? "auto"}
+              onChange={(event) => updateSettings({ inference_mode: event.target.value })}
+            >
+              <option value="auto">Automatic</option>
+              <option value="latency">Latency</option>
+              <option value="throughput">Throughput</option>
+            </select>
+            <span className="block text-[0.7rem] leading-relaxed text-text-2">
+              Latency runs each frame across several threads for the quickest verdict; throughput runs many frames at
+              once for the most cameras. Automatic uses latency while one camera is monitored.
+            </span>
+            <div className="flex items-center justify-between gap-3 rounded border border-line-0 px-3 py-2">
+              <span className="text-xs text-text-1">Active mode</span>
+              <span className="chip">{engine?.stats.inference_mode ?? "throughput"}</span>
+            </div>
+            <label className="label block" htmlFor="power-profile">
+              Power profile
+            </label>
+            <select
+              id="power-profile"
+              className="field w-full"
+              value={engine?.settings.power_profile ?? "full"}
+              onChange={(event) => updateSettings({ power_profile: event.target.value })}
+            >
+              <option value="full">Whole machine</option>
+              <option value="shared">Shared host</option>
+              <option value="raspberry_pi">Raspberry Pi</option>
+              <option value="battery">Laptop on battery</option>
+              <option value="custom" disabled>
+                Custom
+              </option>
+            </select>
+            <span className="block text-[0.7rem] leading-relaxed text-text-2">
+              Sets the four options below together. Shared host leaves half the inference capacity to services such as
+              Klipper or Home Assistant; Raspberry Pi and battery also slow each camera, the live status and the history.
+            </span>
+            <label className="block" htmlFor="inference-budget">
+              <div className="flex justify-between mb-1">
+                <span className="label">Inference budget</span>
+                <span className="mono text-[0.68rem] text-text-0">{Math.round(budget * 100)}%</span>
+              </div>
+              <input
+                id="inference-budget"
+                type="range"
+                min={0.05}
+                max={1}
+                step={0.05}
+                value={budget}
+                onChange={(event) => updateSettings({ inference_budget: Number(event.target.value) })}
+              />
+            </label>
+            <label className="block" htmlFor="camera-cap">
+              <div className="flex justify-between mb-1">
+                <span className="label">Frame rate cap per camera</span>
+                <span className="mono text-[0.68rem] text-text-0">{cameraCap === 0 ? "off" : `${cameraCap} fps`}</span>
+              </div>
+              <input
+                id="camera-cap"
+                type="range"
+                min={0}
+                max={30}
+                step={1}
+                value={cameraCap}
+                onChange={(event) => updateSettings({ max_camera_fps: Number(event.target.value) })}
+              />
+            </label>
+            <label className="block" htmlFor="state-interval">
+              <div className="flex justify-between mb-1">
+                <span className="label">Live status every</span>
+                <span className="mono text-[0.68rem] text-text-0">{stateInterval.toFixed(0)} s</span>
+              </div>
+              <input
+                id="state-interval"
+                type="range"
+                min={1}
+                max={30}
+                step={1}
+                value={stateInterval}
+                onChange={(event) => updateSettings({ state_interval_s: Number(event.target.value) })}
+              />
+            </label>
+            <label className="label block" htmlFor="history-resolution">
+              History resolution
+            </label>
+            <select
+              id="history-resolution"
+              className="field w-full"
+              value={engine?.settings.history_bucket_s ?? 60}
+              onChange={(event) => updateSettings({ history_bucket_s: Number(event.target.value) })}
+            >
+              <option value={60}>1 minute</option>
+              <option value={300}>5 minutes</option>
+              <option value={900}>15 minutes</option>
+            </select>
+            <span className="block text-[0.7rem] leading-relaxed text-text-2">
+              The budget is the share of measured inference capacity the cameras are given. Alerts and scores still
+              arrive as they happen at any status interval.
+            </span>
+            <div className="flex items-center justify-between gap-3 rounded border border-line-0 px-3 py-2">
+              <span className="text-xs text-text-1">Budgeted capacity</span>
+              <span className="chip">{(engine?.stats.capacity_fps ?? 0).toFixed(1)} fps</span>
+            </div>
+            <label className="block" htmlFor="on-demand-share">
+              <div className="flex justify-between mb-1">
+                <span className="label">Share for on-demand classify</span>
+                <span className="mono text-[0.68rem] text-text-0">{Math.round(onDemandShare * 100)}%</span>
+              </div>
+              <input
+                id="on-demand-share"
+                type="range"
+                min={0.05}
+                max={1}
+                step={0.05}
+                value={onDemandShare}
+                onChange={(event) => updateSettings({ on_demand_share: Number(event.target.value) })}
+              />
+            </label>
+            <span className="block text-[0.7rem] leading-relaxed text-text-2">
+              Frames sent to classify wait for a worker no camera needs, and never hold more than this share of them.
+              Requests that cannot be served in time are turned away so monitoring keeps its pace.
+            </span>
+            <div className="flex items-center justify-between gap-3 rounded border border-line-0 px-3 py-2">
+              <span className="text-xs text-text-1">Queued / turned away</span>
+              <span className="chip">
+                {engine?.stats.queued?.user ?? 0} / {engine?.stats.rejected?.user ?? 0}
+              </span>
+            </div>
+            <label className="block" htmlFor="batch-window">
+              <div className="flex justify-between mb-1">
+                <span className="label">Wait to batch frames</span>
+                <span className="mono text-[0.68rem] text-text-0">
+                  {batchWindow === 0 ? "off" : `${batchWindow.toFixed(0)} ms`}
+                </span>
+              </div>
+              <input
+                id="batch-window"
+                type="range"
+                min={0}
+                max={50}
+                step={1}
+                value={batchWindow}
+                onChange={(event) => updateSettings({ batch_window_ms: Number(event.target.value) })}
+              />
+            </label>
+            <span className="block text-[0.7rem] leading-relaxed text-text-2">
+              With a model that takes a dynamic batch, frames from cameras falling due within this long of each other
+              share one model call. Longer packs fuller batches at the cost of a little latency. Off still batches
+              frames that arrive together.
+            </span>
+            <label className="block" htmlFor="frame-reuse">
+              <div className="flex justify-between mb-1">
+                <span className="label">Reuse results for unchanged frames</span>
+                <span className="mono text-[0.68rem] text-text-0">
+                  {reuseDistance === 0 ? "off" : `${reuseDistance.toFixed(1)} levels`}
+                </span>
+              </div>
+              <input
+                id="frame-reuse"
+                type="range"
+                min={0}
+                max={16}
+                step={0.5}
+                value={reuseDistance}
+                onChange={(event) => updateSettings({ frame_reuse_distance: Number(event.target.value) })}
+              />
+            </label>
+            <span className="block text-[0.7rem] leading-relaxed text-text-2">
+              A frame that differs from the last one the model ran on by no more than this many grey levels anywhere
+              reuses its result, for up to 10 seconds, and the capacity it saves goes to other cameras. Off runs the
+              model on every frame.
+            </span>
+            <div className="flex items-center justify-between gap-3 rounded border border-line-0 px-3 py-2">
+              <span className="text-xs text-text-1">Frames reused</span>
+              <span className="chip">{Math.round((engine?.stats.reuse_rate ?? 0) * 100)}%</span>
+            </div>
+            <label className="block" htmlFor="quiet-period">
+              <div className="flex justify-between mb-1">
+                <span className="label">Slow down still cameras after</span>
+                <span className="mono text-[0.68rem] text-text-0">
+                  {quietPeriod === 0 ? "off" : `${quietPeriod.toFixed(0)} s`}
+                </span>
+              </div>
+              <input
+                id="quiet-period"
+                type="range"
+                min={0}
+                max={600}
+                step={10}
+                value={quietPeriod}
+                onChange={(event) => updateSettings({ quiet_period_s: Number(event.target.value) })}
+              />
+            </label>
+            <span className="block text-[0.7rem] leading-relaxed text-text-2">
+              A camera whose view has not changed for this long is checked once every two seconds until something
+              moves, and the capacity it saves goes to other cameras. Off keeps every camera at its full share.
+            </span>
+            <div className="flex items-center justify-between gap-3 rounded border border-line-0 px-3 py-2">
+              <span className="text-xs text-text-1">Still cameras</span>
+              <span className="chip">
+                {engine?.stats.quiet_cameras ?? 0} · {(engine?.stats.quiet_saved_fps ?? 0).toFixed(1)} fps saved
+              </span>
+            </div>
             <div className="flex justify-end">
               <SaveStatus />
             </div>
@@ -35,6 +35,10 @@ export interface Camera {
   rotation: number;
   target_fps: number;
   achieved_fps: number;
+  risk: number;
+  quiet: boolean;
+  service_ms: number;
+  min_fps: number;
   inferring: boolean;
   in_use: boolean;
   online: boolean;
@@ -75,6 +79,7 @@ export interface Monitor {
   notify: boolean;
   on_defect: "none" | "pause" | "cancel";
   cooldown_s: number;
+  detect_within_s: number;
   alert?: Alert | null;
   watching?: boolean;
   result?: ScorePoint | null;
@@ -82,6 +87,7 @@ export interface Monitor {
 
 export interface HistoryBucket {
   t: number;
+  s: number;
   n: number;
   sum: number;
   min: number;
@@ -193,10 +199,19 @@ export interface Layout {
   cameras: LayoutSection;
 }
 
+export type PowerProfile = "full" | "shared" | "raspberry_pi" | "battery" | "custom";
+
 export interface EngineStats {
   inference_device: string;
+  inference_mode: "latency" | "throughput";
   infer_ms: number;
   capacity_fps: number;
+  reuse_rate: number;
+  reused_fps: number;
+  quiet_cameras: number;
+  quiet_saved_fps: number;
+  queued: Record<"user" | "background", number>;
+  rejected: Record<"user" | "background", number>;
 }
 
 export interface UpdateRelease {
@@ -230,7 +245,17 @@ export interface EngineState {
     theme: string;
     themes: CustomTheme[];
     layout?: Layout;
-    inference_runtime: "auto" | "litert" | "onnx";
+    inference_runtime: "auto" | "litert" | "onnx" | "process";
+    inference_mode: "auto" | "latency" | "throughput";
+    batch_window_ms: number;
+    frame_reuse_distance: number;
+    on_demand_share: number;
+    quiet_period_s: number;
+    power_profile: PowerProfile;
+    inference_budget: number;
+    max_camera_fps: number;
+    state_interval_s: number;
+    history_bucket_s: 60 | 300 | 900;
   };
   tokens: ApiToken[];
   stats: EngineStats;